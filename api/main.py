@@ -1,6 +1,7 @@
 from fastapi import FastAPI, UploadFile, File, Depends, HTTPException
 from sqlalchemy.orm import Session
 import pandas as pd
+import importlib.util
 from typing import Optional
 
 from db.session import Base, engine, get_session
@@ -9,6 +10,7 @@ from core.data_processor import DataProcessor
 from core.tri_engine import TRIEngine
 from core.item_calibration import ItemCalibrator
 from core.validators import DataValidator
+from utils.csv_reader import read_csv_utf8
 from api.schemas import ExecutionCreate, ExecutionResponse, ResultsResponse, ResultRecord
 
 
@@ -17,6 +19,12 @@ Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="TRI System API", version="1.0.0")
 
+# Leitor de Excel: calamine (Rust) quando instalado; senão openpyxl
+_EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+
+# Colunas usadas dos arquivos de parâmetros
+_PARAM_FILE_COLUMNS = frozenset(['Questao', 'a', 'b', 'c', 'is_anchor'])
+
 data_processor = DataProcessor()
 tri_engine = TRIEngine()
 validator = DataValidator()
@@ -35,7 +43,7 @@ async def upload_and_process(
     content = await file.read()
 
     if filename.endswith(".csv"):
-        df = pd.read_csv(pd.io.common.BytesIO(content), sep=';', encoding='utf-8')
+        df = read_csv_utf8(pd.io.common.BytesIO(content), sep=';')
         df = data_processor._clean_responses_data(df)
         source_type = "csv"
     elif filename.endswith(".xlsx"):
@@ -61,7 +69,8 @@ async def upload_and_process(
         if params_file.filename.endswith('.csv'):
             params_df = pd.read_csv(pd.io.common.BytesIO(pcontent), encoding='utf-8')
         elif params_file.filename.endswith('.xlsx'):
-            params_df = pd.read_excel(pd.io.common.BytesIO(pcontent))
+            params_df = pd.read_excel(pd.io.common.BytesIO(pcontent), engine=_EXCEL_ENGINE,
+                                      usecols=lambda col: col in _PARAM_FILE_COLUMNS)
         else:
             raise HTTPException(status_code=400, detail="Formato de parâmetros não suportado")
 
@@ -104,7 +113,7 @@ async def calibrate_items(
     if not filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="Envie CSV com colunas padrão")
 
-    df = pd.read_csv(pd.io.common.BytesIO(content), sep=';', encoding='utf-8')
+    df = read_csv_utf8(pd.io.common.BytesIO(content), sep=';')
     df = data_processor._clean_responses_data(df)
 
     # Validar método
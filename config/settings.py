@@ -30,6 +30,7 @@ TRI_CONFIG = {
     "enem_scale": 100,     # Escala ENEM
     "constant": 1.7,       # Constante do modelo 3PL
     "max_iterations": 1000,  # Máximo de iterações para otimização
+    "scoring_max_iterations": 50,  # Máximo de iterações do Fisher scoring
     "tolerance": 1e-6      # Tolerância para convergência
 }
 
@@ -49,7 +50,9 @@ VALIDATION_CONFIG = {
     "min_items": 5,
     "max_items": 100,
     "required_columns": ["CodPessoa", "Questao", "RespostaAluno", "Gabarito"],
-    "param_columns": ["a", "b", "c"]
+    "param_columns": ["a", "b", "c"],
+    "stream_min_bytes": 256 * 1024 * 1024,  # CSVs a partir deste tamanho são validados em blocos
+    "stream_chunksize": 200_000  # Linhas por bloco na validação em blocos
 }
 
 # Configurações de visualização
@@ -4,6 +4,7 @@ Inclui ETL, validação e transformação de dados
 """
 import pandas as pd
 import numpy as np
+import importlib.util
 import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
@@ -11,9 +12,17 @@ import warnings
 
 from config.settings import FILE_CONFIG, VALIDATION_CONFIG
 from utils.logger import get_logger
+from utils.csv_reader import read_csv_utf8
 
 logger = get_logger("data_processor")
 
+# Leitor de Excel: calamine (Rust) quando instalado; senão openpyxl, que o
+# pandas abre em modo somente leitura (read_only/data_only)
+_EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+
+# Colunas lidas das planilhas de parâmetros; as demais nem são convertidas
+_PARAM_FILE_COLUMNS = frozenset(['Questao', *VALIDATION_CONFIG["param_columns"], 'is_anchor'])
+
 
 class DataProcessor:
     """
@@ -37,7 +46,7 @@ class DataProcessor:
         try:
             self.logger.info(f"Carregando arquivo CSV: {file_path}")
             
-            df = pd.read_csv(
+            df = read_csv_utf8(
                 file_path,
                 sep=self.config["input_separator"],
                 encoding=self.config["encoding"]
@@ -74,22 +83,18 @@ class DataProcessor:
         try:
             self.logger.info(f"Carregando arquivo Excel do Streamlit: {uploaded_file.name}")
             
-            # Carregar cabeçalho para identificar colunas de itens
-            df_header = pd.read_excel(uploaded_file, sheet_name=sheet_name, nrows=1)
-            
-            # Identificar colunas de itens
-            item_cols = self._extract_item_columns(df_header.columns)
-            
-            if not item_cols:
-                raise ValueError("Nenhuma coluna de item encontrada no arquivo")
-            
-            # Carregar dados completos
-            uploaded_file.seek(0)  # Reset file pointer
-            df_datos = pd.read_excel(uploaded_file, sheet_name=sheet_name, header=0)
-            
-            # Carregar gabarito da aba Matriz
-            uploaded_file.seek(0)  # Reset file pointer
-            gabarito = self._load_gabarito_from_streamlit(uploaded_file)
+            # Pasta de trabalho aberta uma única vez para as abas de dados e Matriz
+            with pd.ExcelFile(uploaded_file, engine=_EXCEL_ENGINE) as workbook:
+                df_datos = workbook.parse(sheet_name=sheet_name, header=0)
+                
+                # Identificar colunas de itens
+                item_cols = self._extract_item_columns(df_datos.columns)
+                
+                if not item_cols:
+                    raise ValueError("Nenhuma coluna de item encontrada no arquivo")
+                
+                # Carregar gabarito da aba Matriz
+                gabarito = self._load_gabarito_from_streamlit(workbook)
             
             # Processar dados
             df_processed = self._process_excel_data(df_datos, item_cols, gabarito)
@@ -115,20 +120,18 @@ class DataProcessor:
         try:
             self.logger.info(f"Carregando arquivo Excel: {file_path}")
             
-            # Carregar cabeçalho para identificar colunas de itens
-            df_header = pd.read_excel(file_path, sheet_name=sheet_name, nrows=1)
-            
-            # Identificar colunas de itens
-            item_cols = self._extract_item_columns(df_header.columns)
-            
-            if not item_cols:
-                raise ValueError("Nenhuma coluna de item encontrada no arquivo")
-            
-            # Carregar dados completos
-            df_datos = pd.read_excel(file_path, sheet_name=sheet_name, header=0)
-            
-            # Carregar gabarito da aba Matriz
-            gabarito = self._load_gabarito(file_path)
+            # Pasta de trabalho aberta uma única vez para as abas de dados e Matriz
+            with pd.ExcelFile(file_path, engine=_EXCEL_ENGINE) as workbook:
+                df_datos = workbook.parse(sheet_name=sheet_name, header=0)
+                
+                # Identificar colunas de itens
+                item_cols = self._extract_item_columns(df_datos.columns)
+                
+                if not item_cols:
+                    raise ValueError("Nenhuma coluna de item encontrada no arquivo")
+                
+                # Carregar gabarito da aba Matriz
+                gabarito = self._load_gabarito(workbook)
             
             # Processar dados
             df_processed = self._process_excel_data(df_datos, item_cols, gabarito)
@@ -157,7 +160,8 @@ class DataProcessor:
             if file_path.endswith('.csv'):
                 df = pd.read_csv(file_path, encoding=self.config["encoding"])
             elif file_path.endswith('.xlsx'):
-                df = pd.read_excel(file_path)
+                df = pd.read_excel(file_path, engine=_EXCEL_ENGINE,
+                                   usecols=lambda col: col in _PARAM_FILE_COLUMNS)
             else:
                 raise ValueError("Formato de arquivo não suportado")
             
@@ -198,13 +202,13 @@ class DataProcessor:
         Carrega gabarito da aba Matriz do arquivo Streamlit
         
         Args:
-            uploaded_file: Objeto de arquivo do Streamlit
+            uploaded_file: Objeto de arquivo do Streamlit ou pd.ExcelFile já aberto
             
         Returns:
             Dicionário com ID do item e resposta correta
         """
         try:
-            df_matriz = pd.read_excel(uploaded_file, sheet_name='Matriz')
+            df_matriz = pd.read_excel(uploaded_file, sheet_name='Matriz', engine=_EXCEL_ENGINE)
             
             gabarito = {}
             for _, row in df_matriz.iterrows():
@@ -225,13 +229,13 @@ class DataProcessor:
         Carrega gabarito da aba Matriz
         
         Args:
-            file_path: Caminho para o arquivo Excel
+            file_path: Caminho para o arquivo Excel ou pd.ExcelFile já aberto
             
         Returns:
             Dicionário com ID do item e resposta correta
         """
         try:
-            df_matriz = pd.read_excel(file_path, sheet_name='Matriz')
+            df_matriz = pd.read_excel(file_path, sheet_name='Matriz', engine=_EXCEL_ENGINE)
             
             gabarito = {}
             for _, row in df_matriz.iterrows():
@@ -289,7 +293,7 @@ class DataProcessor:
         df_processed = pd.DataFrame(data)
         
         # Adicionar coluna de acerto
-        df_processed['Acerto'] = (df_processed['RespostaAluno'] == df_processed['Gabarito']).astype(int)
+        df_processed['Acerto'] = (df_processed['RespostaAluno'] == df_processed['Gabarito']).astype(np.int8)
         
         return df_processed
     
@@ -318,7 +322,7 @@ class DataProcessor:
         
         # Adicionar coluna de acerto se não existir
         if 'Acerto' not in df.columns:
-            df['Acerto'] = (df['RespostaAluno'] == df['Gabarito']).astype(int)
+            df['Acerto'] = (df['RespostaAluno'] == df['Gabarito']).astype(np.int8)
         
         return df
     
@@ -381,14 +385,13 @@ class DataProcessor:
                     metrics['unique_students'] = len(df)
                 
                 # Verificar completude (todas as colunas de itens preenchidas)
-                item_data = df[list(item_columns.keys())]
-                completeness = (item_data.notna().sum().sum()) / (len(df) * len(item_columns))
+                item_values = df[list(item_columns.keys())].to_numpy()
+                observed = pd.notna(item_values)
+                completeness = observed.sum() / (len(df) * len(item_columns))
                 metrics['completeness'] = completeness
                 
-                # Verificar valores únicos nas respostas
-                unique_responses = set()
-                for col in item_columns.keys():
-                    unique_responses.update(item_data[col].dropna().unique())
+                # Verificar valores únicos nas respostas (uma passada sobre a matriz)
+                unique_responses = pd.unique(item_values[observed])
                 metrics['unique_responses'] = list(unique_responses)
                 metrics['response_variety'] = len(unique_responses)
                 
@@ -402,7 +405,8 @@ class DataProcessor:
                     return {}
                 
                 metrics['format_type'] = 'processed_data'
-                metrics['total_students'] = df['CodPessoa'].nunique()
+                student_codes, students = pd.factorize(df['CodPessoa'])
+                metrics['total_students'] = len(students)
                 metrics['total_items'] = df['Questao'].nunique()
                 metrics['total_responses'] = len(df)
                 
@@ -412,15 +416,17 @@ class DataProcessor:
                 
                 # Calcular acertos se não existir
                 if 'Acerto' not in df.columns:
-                    df['Acerto'] = (df['RespostaAluno'] == df['Gabarito']).astype(int)
+                    df['Acerto'] = (df['RespostaAluno'] == df['Gabarito']).astype(np.int8)
                 
-                # Verificar distribuição de acertos
-                metrics['mean_accuracy'] = df['Acerto'].mean()
-                metrics['std_accuracy'] = df['Acerto'].std()
+                # Verificar distribuição de acertos (direto no array, ignorando ausentes
+                # e com ddof=1 como o Series.std)
+                acertos = df['Acerto'].to_numpy(dtype=np.float64, na_value=np.nan)
+                metrics['mean_accuracy'] = float(np.nanmean(acertos))
+                metrics['std_accuracy'] = float(np.nanstd(acertos, ddof=1))
                 
                 # Verificar estudantes com respostas incompletas
-                responses_per_student = df.groupby('CodPessoa').size()
-                incomplete_students = (responses_per_student != metrics['total_items']).sum()
+                responses_per_student = np.bincount(student_codes[student_codes >= 0], minlength=len(students))
+                incomplete_students = int((responses_per_student != metrics['total_items']).sum())
                 metrics['incomplete_students'] = incomplete_students
             
             # Log das métricas
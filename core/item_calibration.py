@@ -7,7 +7,6 @@ import numpy as np
 from typing import Dict, List, Tuple, Optional
 import warnings
 from scipy.optimize import minimize
-from sklearn.metrics import log_loss
 import logging
 
 logger = logging.getLogger(__name__)
@@ -655,15 +654,16 @@ class ItemCalibrator:
         """
         try:
             anchor_df = pd.read_csv(file_path)
-            anchor_items = {}
-            
-            for _, row in anchor_df.iterrows():
-                questao = int(row['Questao'])
-                anchor_items[questao] = {
-                    'a': float(row['a']),
-                    'b': float(row['b']),
-                    'c': float(row['c'])
-                }
+            
+            # Colunas extraídas como arrays NumPy (sem iterrows/Series por linha)
+            questoes = anchor_df['Questao'].to_numpy(dtype=np.int64)
+            a_values = anchor_df['a'].to_numpy(dtype=np.float64)
+            b_values = anchor_df['b'].to_numpy(dtype=np.float64)
+            c_values = anchor_df['c'].to_numpy(dtype=np.float64)
+            anchor_items = {
+                int(q): {'a': float(a), 'b': float(b), 'c': float(c)}
+                for q, a, b, c in zip(questoes, a_values, b_values, c_values)
+            }
             
             self.logger.info(f"Itens âncora carregados: {len(anchor_items)}")
             return anchor_items
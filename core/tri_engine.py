@@ -14,6 +14,96 @@ from utils.logger import get_logger
 
 logger = get_logger("tri_engine")
 
+# Kernels especializados por conjunto de itens (num_items, dtype, parâmetros)
+_KERNEL_CACHE: Dict[Tuple, "_ItemKernel"] = {}
+_KERNEL_CACHE_SIZE = 32
+
+# Backends aceitos por process_responses
+_BACKENDS = ("cpu", "cupy")
+
+
+class _ItemKernel:
+    """
+    Kernel 3PL especializado para um conjunto fixo de itens
+    
+    Pré-calcula D·a, b, c e (1 - c) uma única vez em arrays contíguos, de modo
+    que a log-verossimilhança de cada estudante é avaliada sem laços Python.
+    """
+    
+    __slots__ = ('num_items', 'da', 'b', 'c', 'one_minus_c', 'da_over_q')
+    
+    def __init__(self, a_params: np.ndarray, b_params: np.ndarray,
+                 c_params: np.ndarray, constant: float):
+        self.num_items = len(a_params)
+        self.da = np.ascontiguousarray(constant * a_params)
+        self.b = np.ascontiguousarray(b_params)
+        self.c = np.ascontiguousarray(c_params)
+        self.one_minus_c = np.ascontiguousarray(1.0 - c_params)
+        self.da_over_q = np.ascontiguousarray(self.da / self.one_minus_c)
+    
+    def probabilities(self, theta: float) -> np.ndarray:
+        """Probabilidades de acerto de todos os itens para um theta"""
+        probs = self.c + self.one_minus_c / (1.0 + np.exp(-self.da * (theta - self.b)))
+        return np.clip(probs, 1e-6, 1 - 1e-6)
+    
+    def neg_log_likelihood(self, theta: float, responses: np.ndarray) -> float:
+        """Log-verossimilhança negativa das respostas para um theta"""
+        probs = self.probabilities(theta)
+        ll = responses * np.log(probs) + (1 - responses) * np.log(1 - probs)
+        return -np.sum(ll)
+    
+    def score_information(self, theta: float, responses: np.ndarray) -> Tuple[float, float]:
+        """
+        Escore e informação esperada de Fisher para um theta
+        
+        Com P' = D·a·(p - c)(1 - p)/(1 - c):
+            S(θ)   = Σ D·a·(u - p)(p - c) / ((1 - c)·p)
+            I_f(θ) = Σ D²·a²·(p - c)²·(1 - p) / ((1 - c)²·p)
+        """
+        probs = self.probabilities(theta)
+        weighted_pc = self.da_over_q * (probs - self.c)
+        score = np.sum(weighted_pc * (responses - probs) / probs)
+        information = np.sum(weighted_pc * weighted_pc * (1 - probs) / probs)
+        return score, information
+
+
+def _get_item_kernel(a_params: np.ndarray, b_params: np.ndarray,
+                     c_params: np.ndarray, constant: float) -> _ItemKernel:
+    """
+    Retorna o kernel especializado para o conjunto de itens, reutilizando-o
+    entre chamadas com os mesmos parâmetros
+    """
+    a = np.asarray(a_params, dtype=np.float64)
+    b = np.asarray(b_params, dtype=np.float64)
+    c = np.asarray(c_params, dtype=np.float64)
+    
+    key = (len(a), a.dtype.str, constant, a.tobytes(), b.tobytes(), c.tobytes())
+    kernel = _KERNEL_CACHE.get(key)
+    if kernel is None:
+        if len(_KERNEL_CACHE) >= _KERNEL_CACHE_SIZE:
+            _KERNEL_CACHE.clear()
+        kernel = _ItemKernel(a, b, c, constant)
+        _KERNEL_CACHE[key] = kernel
+    return kernel
+
+
+def _get_array_module(backend: str):
+    """
+    Retorna o módulo de arrays (NumPy ou CuPy) para o backend solicitado
+    
+    O CuPy é importado sob demanda; se não estiver instalado o cálculo
+    vetorizado continua em NumPy. Outro backend levanta ValueError.
+    """
+    if backend not in _BACKENDS:
+        raise ValueError(f"Backend inválido: {backend!r} (use um de {_BACKENDS})")
+    if backend == "cupy":
+        try:
+            import cupy
+            return cupy
+        except ImportError:
+            logger.warning("CuPy não disponível, usando NumPy no processamento em lote")
+    return np
+
 
 class TRIEngine:
     """
@@ -68,18 +158,17 @@ class TRIEngine:
             Log-verossimilhança negativa
         """
         try:
-            probs = np.array([self.prob_3pl(theta, a, b, c) 
-                             for a, b, c in zip(a_params, b_params, c_params)])
-            
-            # Evitar problemas numéricos
-            probs = np.clip(probs, 1e-6, 1 - 1e-6)
-            
-            ll = responses * np.log(probs) + (1 - responses) * np.log(1 - probs)
-            return -np.sum(ll)
+            kernel = self._get_kernel(a_params, b_params, c_params)
+            return kernel.neg_log_likelihood(theta, responses)
         except Exception as e:
             self.logger.error(f"Erro no cálculo da log-verossimilhança: {e}")
             return float('inf')
     
+    def _get_kernel(self, a_params: np.ndarray, b_params: np.ndarray,
+                    c_params: np.ndarray) -> _ItemKernel:
+        """Obtém o kernel 3PL especializado para os parâmetros dos itens"""
+        return _get_item_kernel(a_params, b_params, c_params, self.config["constant"])
+    
     def estimate_theta(self, responses: np.ndarray, a_params: np.ndarray, 
                       b_params: np.ndarray, c_params: np.ndarray) -> float:
         """
@@ -95,44 +184,97 @@ class TRIEngine:
             Theta estimado
         """
         try:
-            bounds = self.config["theta_bounds"]
-            
-            # Otimização com diferentes pontos iniciais para evitar mínimos locais
-            initial_points = [-2, -1, 0, 1, 2]
-            best_result = None
-            best_value = float('inf')
+            kernel = self._get_kernel(a_params, b_params, c_params)
+        except Exception as e:
+            self.logger.error(f"Erro na estimação de theta: {e}")
+            return 0.0
+        return self._estimate_theta_kernel(responses, kernel)
+    
+    def _estimate_theta_kernel(self, responses: np.ndarray, kernel: _ItemKernel) -> float:
+        """
+        Estima theta usando um kernel 3PL já especializado para os itens
+        """
+        try:
+            theta = self._fisher_scoring([(kernel, responses, 1.0)])
+            if theta is not None:
+                return theta
             
-            for initial_point in initial_points:
-                try:
-                    result = minimize_scalar(
-                        self.log_likelihood,
-                        bounds=bounds,
-                        method='bounded',
-                        args=(responses, a_params, b_params, c_params),
-                        options={'maxiter': self.config["max_iterations"]}
-                    )
-                    
-                    if result.success and result.fun < best_value:
-                        best_result = result
-                        best_value = result.fun
-                        
-                except Exception as e:
-                    self.logger.warning(f"Falha na otimização com ponto inicial {initial_point}: {e}")
-                    continue
+            # Fallback: busca limitada de Brent (não depende de ponto inicial)
+            result = minimize_scalar(
+                kernel.neg_log_likelihood,
+                bounds=self.config["theta_bounds"],
+                method='bounded',
+                args=(responses,),
+                options={'maxiter': self.config["max_iterations"]}
+            )
             
-            if best_result is None:
+            if not result.success:
                 self.logger.warning("Falha na estimação de theta, usando valor padrão")
                 return 0.0
                 
-            return best_result.x
+            return result.x
             
         except Exception as e:
             self.logger.error(f"Erro na estimação de theta: {e}")
             return 0.0
     
+    def _fisher_scoring(self, components: List[Tuple[_ItemKernel, np.ndarray, float]]) -> Optional[float]:
+        """
+        Estima theta por Fisher scoring (informação esperada no lugar da observada)
+        
+        A informação esperada é sempre positiva, então cada passo é de subida
+        da verossimilhança mesmo quando p está próximo de c.
+        
+        Args:
+            components: Lista de (kernel, respostas, peso) somados no escore e na informação
+            
+        Returns:
+            Theta estimado ou None se não convergir
+        """
+        lower, upper = self.config["theta_bounds"]
+        tolerance = self.config["tolerance"]
+        
+        def objective(theta):
+            return sum(weight * kernel.neg_log_likelihood(theta, responses)
+                       for kernel, responses, weight in components)
+        
+        theta = 0.0
+        current = objective(theta)
+        
+        for _ in range(self.config["scoring_max_iterations"]):
+            score = 0.0
+            information = 0.0
+            for kernel, responses, weight in components:
+                item_score, item_information = kernel.score_information(theta, responses)
+                score += weight * item_score
+                information += weight * item_information
+            
+            if not information > 0:
+                return None
+            
+            # Passo limitado aos limites de theta (padrões de resposta extremos param na borda)
+            step = score / information
+            new_theta = min(max(theta + step, lower), upper)
+            if abs(new_theta - theta) < tolerance:
+                return new_theta
+            
+            # Reduzir o passo pela metade até a verossimilhança aumentar
+            candidate = objective(new_theta)
+            while candidate > current:
+                step /= 2
+                if abs(step) < tolerance:
+                    return theta
+                new_theta = min(max(theta + step, lower), upper)
+                candidate = objective(new_theta)
+            
+            theta, current = new_theta, candidate
+        
+        return None
+    
     def estimate_theta_with_anchors(self, responses: np.ndarray, a_params: np.ndarray,
                                    b_params: np.ndarray, c_params: np.ndarray,
-                                   anchor_mask: np.ndarray = None) -> float:
+                                   anchor_mask: np.ndarray = None,
+                                   anchor_split: Optional[Dict] = None) -> float:
         """
         Estima theta usando itens âncora como referência prioritária
         
@@ -142,16 +284,19 @@ class TRIEngine:
             b_params: Parâmetros de dificuldade dos itens
             c_params: Parâmetros de acerto casual dos itens
             anchor_mask: Máscara booleana indicando itens âncora
+            anchor_split: Índices e kernels pré-calculados por _split_anchor_items
+                (evita refazer a separação a cada estudante)
             
         Returns:
             Theta estimado
         """
         try:
-            # Se temos máscara de âncoras, priorizar itens âncora
-            if anchor_mask is not None and np.sum(anchor_mask) > 0:
-                return self._estimate_theta_anchors_priority(
-                    responses, a_params, b_params, c_params, anchor_mask
-                )
+            if anchor_split is None and anchor_mask is not None:
+                anchor_split = self._split_anchor_items(a_params, b_params, c_params, anchor_mask)
+            
+            # Se temos âncoras, priorizar itens âncora
+            if anchor_split is not None and len(anchor_split['anchor_idx']) > 0:
+                return self._estimate_theta_anchors_priority(responses, anchor_split)
             else:
                 # Fallback para estimação padrão
                 return self.estimate_theta(responses, a_params, b_params, c_params)
@@ -160,86 +305,217 @@ class TRIEngine:
             self.logger.error(f"Erro na estimação de theta com âncoras: {e}")
             return self.estimate_theta(responses, a_params, b_params, c_params)
     
-    def _estimate_theta_anchors_priority(self, responses: np.ndarray, a_params: np.ndarray,
-                                        b_params: np.ndarray, c_params: np.ndarray,
-                                        anchor_mask: np.ndarray) -> float:
+    def _split_anchor_items(self, a_params: np.ndarray, b_params: np.ndarray,
+                            c_params: np.ndarray, anchor_mask: np.ndarray) -> Dict:
         """
-        Estima theta priorizando itens âncora para maior estabilidade
+        Separa uma única vez os itens âncora dos demais
+        
+        Returns:
+            Dicionário com índices inteiros e kernels 3PL de cada grupo
         """
-        # Separar respostas e parâmetros de âncoras e não-âncoras
-        anchor_responses = responses[anchor_mask]
-        anchor_a = a_params[anchor_mask]
-        anchor_b = b_params[anchor_mask]
-        anchor_c = c_params[anchor_mask]
+        anchor_mask = np.asarray(anchor_mask, dtype=bool)
+        a_params = np.asarray(a_params, dtype=np.float64)
+        b_params = np.asarray(b_params, dtype=np.float64)
+        c_params = np.asarray(c_params, dtype=np.float64)
         
-        non_anchor_responses = responses[~anchor_mask]
-        non_anchor_a = a_params[~anchor_mask]
-        non_anchor_b = b_params[~anchor_mask]
-        non_anchor_c = c_params[~anchor_mask]
+        anchor_idx = np.flatnonzero(anchor_mask)
+        other_idx = np.flatnonzero(~anchor_mask)
+        
+        return {
+            'anchor_idx': anchor_idx,
+            'other_idx': other_idx,
+            'anchor_kernel': self._get_kernel(a_params[anchor_idx], b_params[anchor_idx],
+                                              c_params[anchor_idx]),
+            'other_kernel': self._get_kernel(a_params[other_idx], b_params[other_idx],
+                                             c_params[other_idx]),
+            'full_kernel': self._get_kernel(a_params, b_params, c_params)
+        }
+    
+    def _estimate_theta_anchors_priority(self, responses: np.ndarray, anchor_split: Dict) -> float:
+        """
+        Estima theta priorizando itens âncora para maior estabilidade
+        """
+        anchor_idx = anchor_split['anchor_idx']
+        other_idx = anchor_split['other_idx']
         
         # Se temos âncoras suficientes, usar apenas elas
-        if len(anchor_responses) >= 3:
-            self.logger.debug(f"Estimando theta usando {len(anchor_responses)} itens âncora")
-            return self.estimate_theta(anchor_responses, anchor_a, anchor_b, anchor_c)
+        if len(anchor_idx) >= 3:
+            self.logger.debug(f"Estimando theta usando {len(anchor_idx)} itens âncora")
+            return self._estimate_theta_kernel(responses[anchor_idx], anchor_split['anchor_kernel'])
         
         # Se temos poucos âncoras, usar todos os itens mas com peso maior para âncoras
-        elif len(anchor_responses) > 0:
-            self.logger.debug(f"Estimando theta com {len(anchor_responses)} âncoras + {len(non_anchor_responses)} outros itens")
+        elif len(anchor_idx) > 0:
+            self.logger.debug(f"Estimando theta com {len(anchor_idx)} âncoras + {len(other_idx)} outros itens")
             return self._estimate_theta_weighted(
-                anchor_responses, anchor_a, anchor_b, anchor_c,
-                non_anchor_responses, non_anchor_a, non_anchor_b, non_anchor_c
+                responses[anchor_idx], anchor_split['anchor_kernel'],
+                responses[other_idx], anchor_split['other_kernel']
             )
         
         # Se não temos âncoras, usar estimação padrão
         else:
             self.logger.debug("Nenhum item âncora disponível, usando estimação padrão")
-            return self.estimate_theta(responses, a_params, b_params, c_params)
+            return self._estimate_theta_kernel(responses, anchor_split['full_kernel'])
     
-    def _estimate_theta_weighted(self, anchor_responses: np.ndarray, anchor_a: np.ndarray,
-                                anchor_b: np.ndarray, anchor_c: np.ndarray,
-                                other_responses: np.ndarray, other_a: np.ndarray,
-                                other_b: np.ndarray, other_c: np.ndarray) -> float:
+    def _estimate_theta_weighted(self, anchor_responses: np.ndarray, anchor_kernel: _ItemKernel,
+                                other_responses: np.ndarray, other_kernel: _ItemKernel) -> float:
         """
         Estima theta com peso maior para itens âncora
         """
         bounds = self.config["theta_bounds"]
         
+        components = [(anchor_kernel, anchor_responses, 2.0)]
+        if len(other_responses) > 0:
+            components.append((other_kernel, other_responses, 1.0))
+        
+        theta = self._fisher_scoring(components)
+        if theta is not None:
+            return theta
+        
         # Função objetivo com peso maior para âncoras
         def weighted_objective(theta):
-            # Log-likelihood dos âncoras (peso 2.0)
-            anchor_ll = self.log_likelihood(theta, anchor_responses, anchor_a, anchor_b, anchor_c)
+            return sum(weight * kernel.neg_log_likelihood(theta, responses)
+                       for kernel, responses, weight in components)
+        
+        # O método 'bounded' não usa ponto inicial: uma única otimização basta
+        try:
+            result = minimize_scalar(
+                weighted_objective,
+                bounds=bounds,
+                method='bounded',
+                options={'xatol': 1e-6}
+            )
+        except Exception:
+            return 0.0
+        
+        return result.x if result.success else 0.0
+    
+    def _fisher_scoring_batch(self, response_matrix, a_params, b_params, c_params,
+                              item_weights, xp) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fisher scoring vetorizado para todos os estudantes de uma vez
+        
+        Mesmo algoritmo de _fisher_scoring, com escore e informação calculados
+        como reduções por linha da matriz estudantes × itens, o que permite
+        executar em GPU via CuPy.
+        
+        Args:
+            response_matrix: Matriz de respostas (estudantes × itens)
+            a_params: Parâmetros de discriminação dos itens
+            b_params: Parâmetros de dificuldade dos itens
+            c_params: Parâmetros de acerto casual dos itens
+            item_weights: Peso de cada item no escore e na informação
+            xp: Módulo de arrays (numpy ou cupy)
             
-            # Log-likelihood dos outros itens (peso 1.0)
-            if len(other_responses) > 0:
-                other_ll = self.log_likelihood(theta, other_responses, other_a, other_b, other_c)
-                total_ll = 2.0 * anchor_ll + 1.0 * other_ll
-            else:
-                total_ll = 2.0 * anchor_ll
+        Returns:
+            Tupla (thetas, convergiu) como arrays NumPy
+        """
+        lower, upper = self.config["theta_bounds"]
+        tolerance = self.config["tolerance"]
+        
+        responses = xp.asarray(response_matrix)
+        da = self.config["constant"] * xp.asarray(a_params, dtype=xp.float64)
+        b = xp.asarray(b_params, dtype=xp.float64)
+        c = xp.asarray(c_params, dtype=xp.float64)
+        weights = xp.asarray(item_weights, dtype=xp.float64)
+        da_over_q = da / (1.0 - c)
+        
+        def probabilities(theta):
+            probs = c + (1.0 - c) / (1.0 + xp.exp(-da * (theta[:, None] - b)))
+            return xp.clip(probs, 1e-6, 1 - 1e-6)
+        
+        def objective(theta):
+            probs = probabilities(theta)
+            ll = responses * xp.log(probs) + (1 - responses) * xp.log(1 - probs)
+            return -(ll * weights).sum(axis=1)
+        
+        num_students = responses.shape[0]
+        theta = xp.zeros(num_students, dtype=xp.float64)
+        current = objective(theta)
+        active = xp.ones(num_students, dtype=bool)
+        converged = xp.zeros(num_students, dtype=bool)
+        
+        for _ in range(self.config["scoring_max_iterations"]):
+            if not bool(active.any()):
+                break
+            
+            probs = probabilities(theta)
+            weighted_pc = da_over_q * (probs - c)
+            score = (weights * weighted_pc * (responses - probs) / probs).sum(axis=1)
+            information = (weights * weighted_pc * weighted_pc * (1 - probs) / probs).sum(axis=1)
+            
+            # Informação não positiva: deixar para a estimação individual
+            active &= information > 0
+            
+            step = xp.where(active, score / xp.where(active, information, 1.0), 0.0)
+            new_theta = xp.clip(theta + step, lower, upper)
+            
+            done = active & (xp.abs(new_theta - theta) < tolerance)
+            theta = xp.where(done, new_theta, theta)
+            converged |= done
+            active &= ~done
+            
+            # Reduzir o passo pela metade apenas dos estudantes cuja verossimilhança piorou
+            candidate = objective(new_theta)
+            worse = active & (candidate > current)
+            while bool(worse.any()):
+                step = xp.where(worse, step / 2, step)
+                small = worse & (xp.abs(step) < tolerance)
+                converged |= small
+                active &= ~small
+                worse &= ~small
+                new_theta = xp.where(worse, xp.clip(theta + step, lower, upper), new_theta)
+                candidate = xp.where(worse, objective(new_theta), candidate)
+                worse &= candidate > current
             
-            return total_ll
+            theta = xp.where(active, new_theta, theta)
+            current = xp.where(active, candidate, current)
         
-        # Otimização com diferentes pontos iniciais
-        initial_points = [-2.0, -1.0, 0.0, 1.0, 2.0]
-        best_theta = 0.0
-        best_ll = float('inf')
+        if xp is not np:
+            return xp.asnumpy(theta), xp.asnumpy(converged)
+        return theta, converged
+    
+    def _estimate_thetas_batch(self, response_matrix: np.ndarray, a_params: np.ndarray,
+                               b_params: np.ndarray, c_params: np.ndarray,
+                               anchor_split: Optional[Dict], backend: str) -> np.ndarray:
+        """
+        Estima theta de todos os estudantes com o Fisher scoring vetorizado
         
-        for initial_theta in initial_points:
-            try:
-                result = minimize_scalar(
-                    weighted_objective,
-                    bounds=bounds,
-                    method='bounded',
-                    options={'xatol': 1e-6}
-                )
-                
-                if result.success and result.fun < best_ll:
-                    best_theta = result.x
-                    best_ll = result.fun
-                    
-            except Exception:
-                continue
+        Aplica as mesmas regras de prioridade das âncoras da estimação
+        individual; estudantes que não convergem no lote são reestimados
+        pelo caminho individual (com fallback de Brent).
+        """
+        xp = _get_array_module(backend)
+        num_items = response_matrix.shape[1]
+        columns = np.arange(num_items)
+        item_weights = np.ones(num_items)
         
-        return best_theta
+        if anchor_split is not None:
+            anchor_idx = anchor_split['anchor_idx']
+            if len(anchor_idx) >= 3:
+                columns = anchor_idx
+                item_weights = np.ones(len(anchor_idx))
+            elif len(anchor_idx) > 0:
+                item_weights[anchor_idx] = 2.0
+        
+        thetas, converged = self._fisher_scoring_batch(
+            response_matrix[:, columns], a_params[columns], b_params[columns],
+            c_params[columns], item_weights, xp
+        )
+        
+        pending = np.flatnonzero(~converged)
+        if len(pending) > 0:
+            self.logger.debug(f"{len(pending)} estudantes reestimados individualmente")
+            kernel = self._get_kernel(a_params, b_params, c_params)
+            for row in pending:
+                responses = response_matrix[row]
+                if anchor_split is not None:
+                    thetas[row] = self.estimate_theta_with_anchors(
+                        responses, a_params, b_params, c_params, anchor_split=anchor_split
+                    )
+                else:
+                    thetas[row] = self._estimate_theta_kernel(responses, kernel)
+        
+        return thetas
     
     def calculate_enem_score(self, theta: float) -> float:
         """
@@ -262,24 +538,45 @@ class TRIEngine:
             return 500.0
     
     def process_responses(self, responses_df: pd.DataFrame, 
-                         params_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+                         params_df: Optional[pd.DataFrame] = None,
+                         anchor_mask: Optional[np.ndarray] = None,
+                         backend: str = "cpu") -> pd.DataFrame:
         """
         Processa as respostas e estima proficiências
         
         Args:
             responses_df: DataFrame com respostas dos alunos
             params_df: DataFrame com parâmetros dos itens (opcional)
+            anchor_mask: Máscara booleana indicando itens âncora (opcional)
+            backend: "cpu" (padrão) estima estudante a estudante; "cupy" estima
+                todos em lote na GPU (vantajoso a partir de dezenas de milhares
+                de estudantes; sem CuPy o lote roda em NumPy). Qualquer outro
+                valor levanta ValueError
             
         Returns:
             DataFrame com resultados (theta e nota ENEM)
         """
+        if backend not in _BACKENDS:
+            raise ValueError(f"Backend inválido: {backend!r} (use um de {_BACKENDS})")
+        
         try:
-            # Preparar dados
-            pivot_df = responses_df.pivot_table(
-                index='CodPessoa', 
-                columns='Questao', 
-                values='Acerto'
-            ).fillna(0).astype(int)
+            # Preparar dados (pares CodPessoa/Questao únicos dispensam a agregação do pivot_table)
+            try:
+                pivot_df = responses_df.pivot(
+                    index='CodPessoa', 
+                    columns='Questao', 
+                    values='Acerto'
+                )
+            except ValueError:
+                self.logger.warning("Respostas duplicadas para o mesmo aluno e questão; mantendo a última")
+                pivot_df = responses_df.drop_duplicates(
+                    subset=['CodPessoa', 'Questao'], keep='last'
+                ).pivot(
+                    index='CodPessoa', 
+                    columns='Questao', 
+                    values='Acerto'
+                )
+            pivot_df = pivot_df.fillna(0).astype(np.uint8)
             
             num_items = pivot_df.shape[1]
             num_students = pivot_df.shape[0]
@@ -288,28 +585,66 @@ class TRIEngine:
             
             # Configurar parâmetros
             if params_df is not None:
-                a_params = params_df['a'].values
-                b_params = params_df['b'].values
-                c_params = params_df['c'].values
+                # Vetores contíguos em float64 (precisão necessária ao Fisher scoring)
+                a_params = np.ascontiguousarray(params_df['a'].to_numpy(), dtype=np.float64)
+                b_params = np.ascontiguousarray(params_df['b'].to_numpy(), dtype=np.float64)
+                c_params = np.ascontiguousarray(params_df['c'].to_numpy(), dtype=np.float64)
                 
                 if len(a_params) != num_items:
                     raise ValueError(f"Número de itens nos parâmetros ({len(a_params)}) "
                                    f"diferente do número de questões ({num_items})")
             else:
                 # Usar parâmetros padrão
-                a_params = np.array([self.config["default_a"]] * num_items)
-                b_params = np.array([self.config["default_b"]] * num_items)
-                c_params = np.array([self.config["default_c"]] * num_items)
+                a_params = np.full(num_items, self.config["default_a"], dtype=np.float64)
+                b_params = np.full(num_items, self.config["default_b"], dtype=np.float64)
+                c_params = np.full(num_items, self.config["default_c"], dtype=np.float64)
+            
+            # Kernel especializado para os itens desta avaliação (reutilizado por estudante)
+            kernel = self._get_kernel(a_params, b_params, c_params)
+            
+            # Separar âncoras uma única vez em vez de refazer a máscara por estudante
+            anchor_split = None
+            if anchor_mask is not None:
+                if len(anchor_mask) != num_items:
+                    raise ValueError(f"Máscara de âncoras ({len(anchor_mask)}) "
+                                   f"diferente do número de questões ({num_items})")
+                anchor_split = self._split_anchor_items(a_params, b_params, c_params, anchor_mask)
+            
+            # Matriz de respostas contígua: cada linha já é o vetor do estudante,
+            # sem construir uma Series por iteração como no iterrows
+            response_matrix = np.ascontiguousarray(pivot_df.to_numpy(dtype=np.uint8))
+            
+            if backend == "cupy":
+                thetas = self._estimate_thetas_batch(
+                    response_matrix, a_params, b_params, c_params, anchor_split, backend
+                )
+                acertos = response_matrix.sum(axis=1, dtype=np.int64)
+                results_df = pd.DataFrame({
+                    'CodPessoa': pivot_df.index.to_numpy(),
+                    'theta': np.round(thetas, 3),
+                    'enem_score': np.round(np.maximum(
+                        0, self.config["enem_base"] + self.config["enem_scale"] * thetas
+                    )).astype(np.int64),
+                    'acertos': acertos,
+                    'total_itens': num_items,
+                    'percentual_acertos': np.round(acertos / num_items * 100, 1)
+                })
+                self.logger.info(f"Processamento concluído. {len(results_df)} estudantes processados")
+                return results_df
             
             # Processar cada estudante
             results = []
             
-            for cod_pessoa, row in tqdm(pivot_df.iterrows(), 
-                                       total=num_students, 
-                                       desc="Estimando proficiências"):
+            for cod_pessoa, responses in tqdm(zip(pivot_df.index, response_matrix), 
+                                              total=num_students, 
+                                              desc="Estimando proficiências"):
                 try:
-                    responses = row.values
-                    theta = self.estimate_theta(responses, a_params, b_params, c_params)
+                    if anchor_split is not None:
+                        theta = self.estimate_theta_with_anchors(
+                            responses, a_params, b_params, c_params, anchor_split=anchor_split
+                        )
+                    else:
+                        theta = self._estimate_theta_kernel(responses, kernel)
                     enem_score = self.calculate_enem_score(theta)
                     
                     acertos = int(np.sum(responses))
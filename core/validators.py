@@ -2,6 +2,11 @@
 Sistema de validação para o projeto TRI
 Valida dados de entrada, parâmetros e resultados
 """
+import functools
+import importlib.util
+import os
+import sys
+import zipfile
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Union
@@ -9,9 +14,150 @@ from pathlib import Path
 
 from config.settings import VALIDATION_CONFIG
 from utils.logger import get_logger
+from utils.csv_reader import read_csv_utf8
 
 logger = get_logger("validators")
 
+# Leitor de Excel: calamine (Rust) quando instalado; senão openpyxl, que o
+# pandas já abre em modo somente leitura
+_EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+
+# numexpr (opcional) avalia comparações e OR em um único kernel multithread,
+# sem arrays booleanos temporários
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# Abaixo deste tamanho o custo de despacho do numexpr supera o ganho
+_NUMEXPR_MIN_SIZE = 100_000
+
+
+def _read_csv(file_path: str, columns: Tuple[str, ...], sep: str = ',',
+              dtype: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Lê de um CSV apenas as colunas de `columns` presentes no arquivo
+    
+    O cabeçalho é lido antes para montar `usecols` como lista, forma aceita
+    tanto pelo parser C quanto pelo pyarrow. Arquivos fora de UTF-8 são
+    rejeitados com UnicodeDecodeError (ver read_csv_utf8).
+    """
+    header = read_csv_utf8(file_path, sep=sep, nrows=0).columns
+    usecols = [col for col in header if col in columns]
+    return read_csv_utf8(file_path, sep=sep, usecols=usecols, dtype=dtype)
+
+
+def _read_excel(file_path: str, columns: Tuple[str, ...], sep: str = ',',
+                dtype: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Lê de um Excel apenas as colunas de `columns` com o engine mais rápido
+    disponível (`sep` existe só para manter a assinatura de _read_csv)
+    """
+    return pd.read_excel(file_path, engine=_EXCEL_ENGINE,
+                         usecols=lambda col: col in columns, dtype=dtype)
+
+
+# Leitor por extensão de arquivo
+_FILE_READERS = {
+    '.csv': _read_csv,
+    '.xlsx': _read_excel
+}
+
+
+# Erros de leitura esperados (ParserError, EmptyDataError e UnicodeDecodeError
+# são subclasses de ValueError; BadZipFile vem de .xlsx corrompidos)
+_READ_ERRORS = (OSError, ValueError, zipfile.BadZipFile)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_frame(file_path: str, mtime_ns: int, size: int,
+                columns: Tuple[str, ...], sep: str = ',') -> pd.DataFrame:
+    """
+    Carrega um arquivo de entrada mantendo em memória os últimos lidos
+    
+    mtime_ns e size fazem parte da chave para que um arquivo alterado seja
+    relido. O DataFrame retornado é compartilhado e não deve ser modificado.
+    """
+    reader = _FILE_READERS[Path(file_path).suffix.lower()]
+    
+    # Apenas as colunas pedidas; alternativas de resposta já chegam como categorias
+    df = reader(file_path, columns, sep=sep,
+                dtype={'RespostaAluno': 'category', 'Gabarito': 'category'})
+    
+    # Identificadores como categorias: contagens e agrupamentos passam a
+    # operar sobre códigos inteiros em vez de strings. A conversão é feita
+    # após a leitura para manter o tipo inferido dos códigos (o leitor
+    # criaria categorias sempre como texto)
+    for col in ('CodPessoa', 'Questao'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    
+    return df
+
+
+def _observed_values(series: pd.Series) -> np.ndarray:
+    """
+    Valores distintos presentes na série
+    
+    Para colunas categóricas os distintos saem dos códigos inteiros, sem
+    percorrer os valores originais.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = np.unique(series.cat.codes.to_numpy())
+        return series.cat.categories.to_numpy()[codes[codes >= 0]]
+    return series.unique()
+
+
+def _missing_columns(required: Tuple[str, ...], columns) -> List[str]:
+    """
+    Colunas de `required` ausentes em `columns`, na ordem do esquema
+    
+    Um único conjunto das colunas presentes atende a todas as consultas.
+    """
+    present = set(columns)
+    return [col for col in required if col not in present]
+
+
+def _count_outside(values: np.ndarray, low: float, high: float) -> int:
+    """Quantidade de valores fora de [low, high] via numexpr (NaN não conta)"""
+    return int(numexpr.evaluate(
+        "sum(where((values < low) | (values > high), 1, 0))",
+        local_dict={'values': values, 'low': low, 'high': high}
+    ))
+
+
+def _use_numexpr(values: np.ndarray) -> bool:
+    """Indica se a coluna é grande o bastante para usar numexpr"""
+    return numexpr is not None and values.size >= _NUMEXPR_MIN_SIZE
+
+
+def _describe(values: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    Média, desvio padrão amostral, mínimo e máximo ignorando nulos (como o pandas)
+    
+    Args:
+        values: Array numérico
+        
+    Returns:
+        Tupla (média, desvio, mínimo, máximo); NaN se não houver valores
+    """
+    # A soma (acumulada em float64) já denuncia
+    # nulos: só então a coluna é filtrada
+    total = values.sum(dtype=np.float64)
+    if np.isnan(total):
+        values = values[~np.isnan(values)]
+        total = values.sum(dtype=np.float64)
+    
+    n = values.size
+    if n == 0:
+        return np.nan, np.nan, np.nan, np.nan
+    
+    # Média da soma e desvio de um único produto escalar dos resíduos
+    mean = total / n
+    residuals = values - mean
+    std = float(np.sqrt(np.dot(residuals, residuals) / (n - 1))) if n > 1 else np.nan
+    return float(mean), std, float(values.min()), float(values.max())
+
 
 class DataValidator:
     """
@@ -21,6 +167,11 @@ class DataValidator:
     def __init__(self):
         self.logger = logger
         self.config = VALIDATION_CONFIG
+        
+        # Esquema fixo resolvido uma única vez (tuplas servem também de chave de cache)
+        self._required_columns = tuple(self.config["required_columns"])
+        self._param_columns = tuple(self.config["param_columns"])
+        self._result_columns = ('CodPessoa', 'theta', 'enem_score')
     
     def validate_responses_file(self, file_path: str) -> Dict[str, any]:
         """
@@ -39,41 +190,32 @@ class DataValidator:
             'metrics': {}
         }
         
-        try:
-            # Verificar se arquivo existe
-            if not Path(file_path).exists():
-                validation_result['errors'].append(f"Arquivo não encontrado: {file_path}")
-                return validation_result
-            
-            # Carregar dados
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path, sep=';', encoding='utf-8')
-            elif file_path.endswith('.xlsx'):
-                df = pd.read_excel(file_path)
-            else:
-                validation_result['errors'].append("Formato de arquivo não suportado")
-                return validation_result
-            
-            # Validar colunas obrigatórias
-            required_cols = self.config["required_columns"]
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            
-            if missing_cols:
-                validation_result['errors'].append(f"Colunas obrigatórias ausentes: {missing_cols}")
-            else:
-                validation_result['warnings'].append("Colunas obrigatórias presentes")
-            
-            # Validar dados
-            if len(df) > 0:
-                validation_result.update(self._validate_response_data(df))
-            else:
-                validation_result['errors'].append("Arquivo vazio")
-            
-            # Determinar se é válido
-            validation_result['valid'] = len(validation_result['errors']) == 0
-            
-        except Exception as e:
-            validation_result['errors'].append(f"Erro na validação: {str(e)}")
+        # CSVs muito grandes são validados em blocos, sem carregar o arquivo inteiro
+        if self._should_stream(file_path):
+            return self._validate_responses_stream(file_path, validation_result)
+        
+        # Carregar dados (reaproveitado por validate_results para o mesmo arquivo)
+        required_cols = self._required_columns
+        df = self._load(file_path, required_cols, validation_result['errors'], sep=';')
+        if df is None:
+            return validation_result
+        
+        # Validar colunas obrigatórias
+        missing_cols = _missing_columns(required_cols, df.columns)
+        
+        if missing_cols:
+            validation_result['errors'].append(f"Colunas obrigatórias ausentes: {missing_cols}")
+        else:
+            validation_result['warnings'].append("Colunas obrigatórias presentes")
+        
+        # Validar dados
+        if len(df) == 0:
+            validation_result['errors'].append("Arquivo vazio")
+        elif not missing_cols:
+            validation_result.update(self._validate_response_data(df))
+        
+        # Determinar se é válido
+        validation_result['valid'] = len(validation_result['errors']) == 0
         
         return validation_result
     
@@ -95,58 +237,46 @@ class DataValidator:
             'metrics': {}
         }
         
-        try:
-            # Verificar se arquivo existe
-            if not Path(file_path).exists():
-                validation_result['errors'].append(f"Arquivo não encontrado: {file_path}")
-                return validation_result
-            
-            # Carregar dados
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path, encoding='utf-8')
-            elif file_path.endswith('.xlsx'):
-                df = pd.read_excel(file_path)
-            else:
-                validation_result['errors'].append("Formato de arquivo não suportado")
-                return validation_result
-            
-            # Validar colunas
-            param_cols = self.config["param_columns"]
-            missing_cols = [col for col in param_cols if col not in df.columns]
-            
-            if missing_cols:
-                validation_result['errors'].append(f"Colunas de parâmetros ausentes: {missing_cols}")
-            else:
-                validation_result['warnings'].append("Colunas de parâmetros presentes")
-            
-            # Validar valores
-            if len(df) > 0:
-                validation_result.update(self._validate_parameter_values(df))
-                
-                # Verificar número de itens
-                if num_items is not None and len(df) != num_items:
-                    validation_result['errors'].append(
-                        f"Número de itens ({len(df)}) diferente do esperado ({num_items})"
-                    )
-            else:
-                validation_result['errors'].append("Arquivo vazio")
-            
-            # Determinar se é válido
-            validation_result['valid'] = len(validation_result['errors']) == 0
+        # Carregar apenas as colunas de parâmetros
+        param_cols = self._param_columns
+        df = self._load(file_path, param_cols, validation_result['errors'])
+        if df is None:
+            return validation_result
+        
+        # Validar colunas
+        missing_cols = _missing_columns(param_cols, df.columns)
+        
+        if missing_cols:
+            validation_result['errors'].append(f"Colunas de parâmetros ausentes: {missing_cols}")
+        else:
+            validation_result['warnings'].append("Colunas de parâmetros presentes")
+        
+        # Validar valores
+        if len(df) > 0:
+            validation_result.update(self._validate_parameter_values(df))
             
-        except Exception as e:
-            validation_result['errors'].append(f"Erro na validação: {str(e)}")
+            # Verificar número de itens
+            if num_items is not None and len(df) != num_items:
+                validation_result['errors'].append(
+                    f"Número de itens ({len(df)}) diferente do esperado ({num_items})"
+                )
+        else:
+            validation_result['errors'].append("Arquivo vazio")
+        
+        # Determinar se é válido
+        validation_result['valid'] = len(validation_result['errors']) == 0
         
         return validation_result
     
     def validate_results(self, results_df: pd.DataFrame, 
-                        input_df: Optional[pd.DataFrame] = None) -> Dict[str, any]:
+                        input_df: Optional[Union[pd.DataFrame, str, Path]] = None) -> Dict[str, any]:
         """
         Valida resultados da TRI
         
         Args:
             results_df: DataFrame com resultados
-            input_df: DataFrame de entrada original (opcional)
+            input_df: DataFrame de entrada original ou caminho do arquivo de
+                respostas (opcional; arquivos já validados não são relidos)
             
         Returns:
             Dicionário com resultados da validação
@@ -158,48 +288,182 @@ class DataValidator:
             'metrics': {}
         }
         
+        # Verificar colunas obrigatórias
+        required_cols = self._result_columns
+        missing_cols = _missing_columns(required_cols, results_df.columns)
+        
+        if missing_cols:
+            validation_result['errors'].append(f"Colunas obrigatórias ausentes: {missing_cols}")
+            return validation_result
+        
+        non_numeric = [col for col in ('theta', 'enem_score')
+                       if not pd.api.types.is_numeric_dtype(results_df[col])]
+        if non_numeric:
+            validation_result['errors'].append(f"Colunas não numéricas: {non_numeric}")
+            return validation_result
+        
+        # Extrair as colunas numéricas uma única vez para todas as verificações
+        # Em float64: um cast para float32 arredondaria valores logo acima dos
+        # limites (ex.: 1000.00001) para dentro do intervalo
+        theta = results_df['theta'].to_numpy(dtype=np.float64)
+        enem = results_df['enem_score'].to_numpy(dtype=np.float64)
+        
+        # Validar valores de theta
+        theta_validation = self._validate_theta_values(theta)
+        validation_result['errors'].extend(theta_validation['errors'])
+        validation_result['warnings'].extend(theta_validation['warnings'])
+        
+        # Validar valores de ENEM
+        enem_validation = self._validate_enem_values(enem)
+        validation_result['errors'].extend(enem_validation['errors'])
+        validation_result['warnings'].extend(enem_validation['warnings'])
+        
+        # Verificar consistência com dados de entrada
+        if isinstance(input_df, (str, Path)):
+            input_df = self._load(input_df, self._required_columns,
+                                  validation_result['errors'], sep=';')
+        if input_df is not None:
+            consistency_validation = self._validate_consistency(results_df, input_df)
+            validation_result['errors'].extend(consistency_validation['errors'])
+            validation_result['warnings'].extend(consistency_validation['warnings'])
+        
+        # Calcular métricas
+        validation_result['metrics'] = self._calculate_result_metrics(results_df, theta, enem)
+        
+        # Determinar se é válido
+        validation_result['valid'] = len(validation_result['errors']) == 0
+        
+        return validation_result
+    
+    def _load(self, file_path: Union[str, Path], columns: Tuple[str, ...],
+              errors: List[str], sep: str = ',') -> Optional[pd.DataFrame]:
+        """
+        Carrega um arquivo de entrada após verificar caminho, formato e tamanho
+        
+        Args:
+            file_path: Caminho para o arquivo
+            columns: Colunas a carregar
+            errors: Lista onde os erros de carregamento são registrados
+            sep: Separador (apenas CSV)
+            
+        Returns:
+            DataFrame carregado ou None se o arquivo não puder ser lido
+        """
+        # Existência e tamanho em uma única chamada de sistema
+        try:
+            file_stat = os.stat(file_path)
+        except FileNotFoundError:
+            errors.append(f"Arquivo não encontrado: {file_path}")
+            return None
+        
+        if Path(file_path).suffix.lower() not in _FILE_READERS:
+            errors.append("Formato de arquivo não suportado")
+            return None
+        
+        if file_stat.st_size == 0:
+            errors.append("Arquivo vazio")
+            return None
+        
+        # Apenas a leitura fica protegida; a validação em si não levanta exceções
         try:
-            # Verificar colunas obrigatórias
-            required_cols = ['CodPessoa', 'theta', 'enem_score']
-            missing_cols = [col for col in required_cols if col not in results_df.columns]
+            return _load_frame(os.fspath(file_path), file_stat.st_mtime_ns,
+                               file_stat.st_size, columns, sep)
+        except _READ_ERRORS as e:
+            errors.append(f"Erro na validação: {str(e)}")
+            return None
+    
+    def _validate_response_data(self, df: pd.DataFrame) -> Dict[str, any]:
+        """
+        Valida dados de respostas
+        
+        Args:
+            df: DataFrame com respostas
             
+        Returns:
+            Dicionário com resultados da validação
+        """
+        # Contar valores nulos coluna a coluna, sem montar um sub-DataFrame
+        null_counts = [np.count_nonzero(df[col].isna().to_numpy()) for col in self._required_columns]
+        
+        # Códigos inteiros por estudante/questão: um único hash por coluna
+        # fornece a contagem de distintos e, via bincount, as respostas por estudante
+        student_codes, students = pd.factorize(df['CodPessoa'], sort=False)
+        _, items = pd.factorize(df['Questao'], sort=False)
+        responses_per_student = np.bincount(student_codes[student_codes >= 0], minlength=len(students))
+        
+        return self._summarize_responses(null_counts, responses_per_student, len(items), len(df))
+    
+    def _should_stream(self, file_path: Union[str, Path]) -> bool:
+        """Indica se o arquivo de respostas deve ser validado em blocos"""
+        if Path(file_path).suffix.lower() != '.csv':
+            return False
+        try:
+            return os.stat(file_path).st_size >= self.config["stream_min_bytes"]
+        except OSError:
+            return False
+    
+    def _validate_responses_stream(self, file_path: Union[str, Path],
+                                   validation_result: Dict[str, any]) -> Dict[str, any]:
+        """
+        Valida um CSV de respostas em blocos, acumulando apenas contagens
+        
+        A memória usada é proporcional ao número de estudantes, não ao de linhas.
+        
+        Args:
+            file_path: Caminho para o arquivo
+            validation_result: Dicionário de resultado a preencher
+            
+        Returns:
+            Dicionário com resultados da validação
+        """
+        required_cols = self._required_columns
+        null_counts = np.zeros(len(required_cols), dtype=np.int64)
+        responses_per_student = pd.Series(dtype=np.int64)
+        items = pd.Index([])
+        total_responses = 0
+        
+        try:
+            header = pd.read_csv(file_path, sep=';', encoding='utf-8', nrows=0).columns
+            missing_cols = _missing_columns(required_cols, header)
             if missing_cols:
                 validation_result['errors'].append(f"Colunas obrigatórias ausentes: {missing_cols}")
                 return validation_result
+            validation_result['warnings'].append("Colunas obrigatórias presentes")
             
-            # Validar valores de theta
-            theta_validation = self._validate_theta_values(results_df['theta'])
-            validation_result['errors'].extend(theta_validation['errors'])
-            validation_result['warnings'].extend(theta_validation['warnings'])
-            
-            # Validar valores de ENEM
-            enem_validation = self._validate_enem_values(results_df['enem_score'])
-            validation_result['errors'].extend(enem_validation['errors'])
-            validation_result['warnings'].extend(enem_validation['warnings'])
-            
-            # Verificar consistência com dados de entrada
-            if input_df is not None:
-                consistency_validation = self._validate_consistency(results_df, input_df)
-                validation_result['errors'].extend(consistency_validation['errors'])
-                validation_result['warnings'].extend(consistency_validation['warnings'])
-            
-            # Calcular métricas
-            validation_result['metrics'] = self._calculate_result_metrics(results_df)
-            
-            # Determinar se é válido
-            validation_result['valid'] = len(validation_result['errors']) == 0
-            
-        except Exception as e:
+            chunks = pd.read_csv(file_path, sep=';', encoding='utf-8', usecols=list(required_cols),
+                                 chunksize=self.config["stream_chunksize"])
+            for chunk in chunks:
+                null_counts += [np.count_nonzero(chunk[col].isna().to_numpy()) for col in required_cols]
+                responses_per_student = responses_per_student.add(
+                    chunk['CodPessoa'].value_counts(), fill_value=0
+                )
+                items = items.union(pd.Index(chunk['Questao'].dropna().unique()))
+                total_responses += len(chunk)
+        except _READ_ERRORS as e:
             validation_result['errors'].append(f"Erro na validação: {str(e)}")
+            return validation_result
         
+        if total_responses == 0:
+            validation_result['errors'].append("Arquivo vazio")
+        else:
+            validation_result.update(self._summarize_responses(
+                null_counts, responses_per_student.to_numpy(dtype=np.int64),
+                len(items), total_responses
+            ))
+        
+        validation_result['valid'] = len(validation_result['errors']) == 0
         return validation_result
     
-    def _validate_response_data(self, df: pd.DataFrame) -> Dict[str, any]:
+    def _summarize_responses(self, null_counts, responses_per_student: np.ndarray,
+                             num_items: int, total_responses: int) -> Dict[str, any]:
         """
-        Valida dados de respostas
+        Gera avisos e métricas a partir das contagens das respostas
         
         Args:
-            df: DataFrame com respostas
+            null_counts: Valores nulos por coluna obrigatória
+            responses_per_student: Número de respostas de cada estudante
+            num_items: Número de itens distintos
+            total_responses: Número total de linhas
             
         Returns:
             Dicionário com resultados da validação
@@ -207,28 +471,25 @@ class DataValidator:
         result = {'errors': [], 'warnings': [], 'metrics': {}}
         
         # Verificar valores nulos
-        null_counts = df[self.config["required_columns"]].isnull().sum()
-        for col, count in null_counts.items():
+        for col, count in zip(self._required_columns, null_counts):
             if count > 0:
                 result['warnings'].append(f"Coluna {col} tem {count} valores nulos")
         
         # Verificar número de estudantes
-        num_students = df['CodPessoa'].nunique()
+        num_students = len(responses_per_student)
         if num_students < self.config["min_students"]:
             result['warnings'].append(f"Poucos estudantes ({num_students})")
         elif num_students > self.config["max_students"]:
             result['warnings'].append(f"Muitos estudantes ({num_students})")
         
         # Verificar número de itens
-        num_items = df['Questao'].nunique()
         if num_items < self.config["min_items"]:
             result['warnings'].append(f"Poucos itens ({num_items})")
         elif num_items > self.config["max_items"]:
             result['warnings'].append(f"Muitos itens ({num_items})")
         
         # Verificar respostas completas
-        responses_per_student = df.groupby('CodPessoa').size()
-        incomplete_students = (responses_per_student != num_items).sum()
+        incomplete_students = int(np.count_nonzero(responses_per_student != num_items))
         if incomplete_students > 0:
             result['warnings'].append(f"{incomplete_students} estudantes com respostas incompletas")
         
@@ -236,9 +497,9 @@ class DataValidator:
         result['metrics'] = {
             'total_students': num_students,
             'total_items': num_items,
-            'total_responses': len(df),
+            'total_responses': total_responses,
             'incomplete_students': incomplete_students,
-            'completeness': len(df) / (num_students * num_items)
+            'completeness': total_responses / (num_students * num_items) if num_students * num_items else 0.0
         }
         
         return result
@@ -255,76 +516,108 @@ class DataValidator:
         """
         result = {'errors': [], 'warnings': [], 'metrics': {}}
         
+        # Apenas colunas numéricas seguem para as verificações de valores
+        numeric_cols = set()
+        for col in ('a', 'b', 'c'):
+            if col in df.columns:
+                if pd.api.types.is_numeric_dtype(df[col]):
+                    numeric_cols.add(col)
+                else:
+                    result['errors'].append(f"Valores de '{col}' devem ser numéricos")
+        
+        # Os limites são verificados pelos extremos de cada coluna, sem máscaras booleanas
+        
         # Validar parâmetro 'a' (discriminação)
-        if 'a' in df.columns:
-            if (df['a'] <= 0).any():
+        if 'a' in numeric_cols:
+            a_mean, a_std, a_min, _ = _describe(df['a'].to_numpy(dtype=np.float64))
+            if a_min <= 0:
                 result['errors'].append("Valores de 'a' devem ser positivos")
             else:
-                result['metrics']['a_mean'] = df['a'].mean()
-                result['metrics']['a_std'] = df['a'].std()
+                result['metrics']['a_mean'] = a_mean
+                result['metrics']['a_std'] = a_std
         
         # Validar parâmetro 'b' (dificuldade)
-        if 'b' in df.columns:
-            result['metrics']['b_mean'] = df['b'].mean()
-            result['metrics']['b_std'] = df['b'].std()
-            result['metrics']['b_range'] = (df['b'].min(), df['b'].max())
+        if 'b' in numeric_cols:
+            b_mean, b_std, b_min, b_max = _describe(df['b'].to_numpy(dtype=np.float64))
+            result['metrics']['b_mean'] = b_mean
+            result['metrics']['b_std'] = b_std
+            result['metrics']['b_range'] = (b_min, b_max)
         
         # Validar parâmetro 'c' (acerto casual)
-        if 'c' in df.columns:
-            if (df['c'] < 0).any() or (df['c'] > 1).any():
+        if 'c' in numeric_cols:
+            c_mean, c_std, c_min, c_max = _describe(df['c'].to_numpy(dtype=np.float64))
+            if c_min < 0 or c_max > 1:
                 result['errors'].append("Valores de 'c' devem estar entre 0 e 1")
             else:
-                result['metrics']['c_mean'] = df['c'].mean()
-                result['metrics']['c_std'] = df['c'].std()
+                result['metrics']['c_mean'] = c_mean
+                result['metrics']['c_std'] = c_std
         
         return result
     
-    def _validate_theta_values(self, theta_series: pd.Series) -> Dict[str, any]:
+    def _validate_theta_values(self, theta_values: Union[pd.Series, np.ndarray]) -> Dict[str, any]:
         """
         Valida valores de theta
         
         Args:
-            theta_series: Série com valores de theta
+            theta_values: Valores de theta (Série ou array)
             
         Returns:
             Dicionário com resultados da validação
         """
         result = {'errors': [], 'warnings': []}
         
-        # Verificar limites
         bounds = (-4, 4)
-        out_of_bounds = ((theta_series < bounds[0]) | (theta_series > bounds[1])).sum()
+        theta = np.asarray(theta_values, dtype=np.float64)
+        
+        if _use_numexpr(theta):
+            out_of_bounds = _count_outside(theta, *bounds)
+            extreme_values = _count_outside(theta, -3, 3)
+        else:
+            # Limites simétricos: um único |theta| atende às duas verificações
+            abs_theta = np.abs(theta)
+            out_of_bounds = np.count_nonzero(abs_theta > bounds[1])
+            extreme_values = np.count_nonzero(abs_theta > 3)
         
+        # Verificar limites
         if out_of_bounds > 0:
             result['warnings'].append(f"{out_of_bounds} valores de theta fora dos limites {bounds}")
         
         # Verificar valores extremos
-        extreme_values = ((theta_series < -3) | (theta_series > 3)).sum()
         if extreme_values > 0:
             result['warnings'].append(f"{extreme_values} valores extremos de theta (< -3 ou > 3)")
         
         return result
     
-    def _validate_enem_values(self, enem_series: pd.Series) -> Dict[str, any]:
+    def _validate_enem_values(self, enem_values: Union[pd.Series, np.ndarray]) -> Dict[str, any]:
         """
         Valida valores de nota ENEM
         
         Args:
-            enem_series: Série com valores de nota ENEM
+            enem_values: Valores de nota ENEM (Série ou array)
             
         Returns:
             Dicionário com resultados da validação
         """
         result = {'errors': [], 'warnings': []}
         
-        # Verificar limites
-        out_of_bounds = ((enem_series < 0) | (enem_series > 1000)).sum()
+        enem = np.asarray(enem_values, dtype=np.float64)
+        
+        if _use_numexpr(enem):
+            out_of_bounds = _count_outside(enem, 0, 1000)
+            extreme_values = _count_outside(enem, 100, 1100)
+        else:
+            # Uma comparação por cauda sobre a coluna inteira; os limites mais
+            # rígidos são testados apenas no subconjunto já selecionado
+            low = enem[enem < 100]
+            high = enem[enem > 1000]
+            out_of_bounds = np.count_nonzero(low < 0) + high.size
+            extreme_values = low.size + np.count_nonzero(high > 1100)
         
+        # Verificar limites
         if out_of_bounds > 0:
             result['errors'].append(f"{out_of_bounds} notas ENEM fora dos limites (0-1000)")
         
         # Verificar valores extremos
-        extreme_values = ((enem_series < 100) | (enem_series > 1100)).sum()
         if extreme_values > 0:
             result['warnings'].append(f"{extreme_values} notas extremas (< 100 ou > 1100)")
         
@@ -344,44 +637,60 @@ class DataValidator:
         """
         result = {'errors': [], 'warnings': []}
         
+        if 'CodPessoa' not in input_df.columns:
+            result['errors'].append("Coluna CodPessoa ausente nos dados de entrada")
+            return result
+        
         # Verificar se todos os estudantes estão nos resultados
-        input_students = set(input_df['CodPessoa'].unique())
-        result_students = set(results_df['CodPessoa'].unique())
+        input_students = _observed_values(input_df['CodPessoa'])
+        result_students = _observed_values(results_df['CodPessoa'])
         
-        missing_students = input_students - result_students
-        extra_students = result_students - input_students
+        try:
+            # Diferença por ordenação em C sobre arrays de distintos
+            num_missing = np.setdiff1d(input_students, result_students, assume_unique=True).size
+            num_extra = np.setdiff1d(result_students, input_students, assume_unique=True).size
+        except TypeError:
+            # Tipos não comparáveis entre si (ex.: códigos str e int misturados)
+            input_set, result_set = set(input_students), set(result_students)
+            num_missing = len(input_set - result_set)
+            num_extra = len(result_set - input_set)
         
-        if missing_students:
-            result['errors'].append(f"{len(missing_students)} estudantes ausentes nos resultados")
+        if num_missing:
+            result['errors'].append(f"{num_missing} estudantes ausentes nos resultados")
         
-        if extra_students:
-            result['warnings'].append(f"{len(extra_students)} estudantes extras nos resultados")
+        if num_extra:
+            result['warnings'].append(f"{num_extra} estudantes extras nos resultados")
         
         return result
     
-    def _calculate_result_metrics(self, results_df: pd.DataFrame) -> Dict[str, any]:
+    def _calculate_result_metrics(self, results_df: pd.DataFrame,
+                                  theta: Optional[np.ndarray] = None,
+                                  enem: Optional[np.ndarray] = None) -> Dict[str, any]:
         """
         Calcula métricas dos resultados
         
         Args:
             results_df: DataFrame com resultados
+            theta: Valores de theta já extraídos (opcional)
+            enem: Notas ENEM já extraídas (opcional)
             
         Returns:
             Dicionário com métricas
         """
         metrics = {}
         
+        if theta is None:
+            theta = results_df['theta'].to_numpy(dtype=np.float64)
+        if enem is None:
+            enem = results_df['enem_score'].to_numpy(dtype=np.float64)
+        
         # Estatísticas de theta
-        metrics['theta_mean'] = results_df['theta'].mean()
-        metrics['theta_std'] = results_df['theta'].std()
-        metrics['theta_min'] = results_df['theta'].min()
-        metrics['theta_max'] = results_df['theta'].max()
+        (metrics['theta_mean'], metrics['theta_std'],
+         metrics['theta_min'], metrics['theta_max']) = _describe(theta)
         
         # Estatísticas de ENEM
-        metrics['enem_mean'] = results_df['enem_score'].mean()
-        metrics['enem_std'] = results_df['enem_score'].std()
-        metrics['enem_min'] = results_df['enem_score'].min()
-        metrics['enem_max'] = results_df['enem_score'].max()
+        (metrics['enem_mean'], metrics['enem_std'],
+         metrics['enem_min'], metrics['enem_max']) = _describe(enem)
         
         # Distribuição
         metrics['total_students'] = len(results_df)
@@ -395,33 +704,30 @@ class DataValidator:
         Args:
             validation_result: Resultado da validação
         """
-        print("\n" + "="*50)
-        print("RELATÓRIO DE VALIDAÇÃO")
-        print("="*50)
+        # Montar o relatório inteiro e escrevê-lo de uma vez
+        lines = ["", "="*50, "RELATÓRIO DE VALIDAÇÃO", "="*50]
         
         # Status geral
         status = "✅ VÁLIDO" if validation_result['valid'] else "❌ INVÁLIDO"
-        print(f"Status: {status}")
+        lines.append(f"Status: {status}")
         
         # Erros
         if validation_result['errors']:
-            print(f"\n❌ ERROS ({len(validation_result['errors'])}):")
-            for error in validation_result['errors']:
-                print(f"  • {error}")
+            lines.extend(["", f"❌ ERROS ({len(validation_result['errors'])}):"])
+            lines.extend(f"  • {error}" for error in validation_result['errors'])
         
         # Avisos
         if validation_result['warnings']:
-            print(f"\n⚠️ AVISOS ({len(validation_result['warnings'])}):")
-            for warning in validation_result['warnings']:
-                print(f"  • {warning}")
+            lines.extend(["", f"⚠️ AVISOS ({len(validation_result['warnings'])}):"])
+            lines.extend(f"  • {warning}" for warning in validation_result['warnings'])
         
         # Métricas
         if validation_result['metrics']:
-            print(f"\n📊 MÉTRICAS:")
-            for key, value in validation_result['metrics'].items():
-                if isinstance(value, float):
-                    print(f"  • {key}: {value:.3f}")
-                else:
-                    print(f"  • {key}: {value}")
-        
-        print("="*50 + "\n")
+            lines.extend(["", "📊 MÉTRICAS:"])
+            lines.extend(
+                f"  • {key}: {value:.3f}" if isinstance(value, float) else f"  • {key}: {value}"
+                for key, value in validation_result['metrics'].items()
+            )
+        
+        lines.extend(["="*50, ""])
+        sys.stdout.write("\n".join(lines) + "\n")
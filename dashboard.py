@@ -3,24 +3,25 @@ Dashboard Web para o Sistema TRI
 Interface gráfica para visualização e análise
 """
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
+from typing import Optional, Tuple
+import functools
+import hashlib
+import importlib.util
 import io
-import base64
+from contextlib import contextmanager
 
 # Importar módulos do sistema
 from core.tri_engine import TRIEngine
 from core.data_processor import DataProcessor
 from core.validators import DataValidator
 from core.item_calibration import ItemCalibrator
-from utils.visualizations import TRIVisualizer
 from config.settings import get_config
+from utils.csv_reader import read_csv_utf8
 from db.session import Base, engine, SessionLocal
 from db import crud
 
@@ -59,42 +60,690 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# Fragmentos (st.fragment) reexecutam só o próprio trecho a cada interação;
+# em versões sem suporte o método é executado normalmente
+_st_fragment = getattr(st, "fragment", None) or (lambda func: func)
+
+
+@contextmanager
+def _db_session():
+    """
+    Sessão do banco compartilhada por todas as ações de uma execução do script
+    
+    O SessionLocal (scoped_session) devolve a mesma Session dentro da thread
+    da execução, que não é fechada a cada ação: ela só é descartada ao fim do
+    run completo (main) ou da reexecução isolada de um fragmento (_fragment).
+    Em caso de erro a transação é desfeita para que as ações seguintes
+    encontrem a sessão limpa.
+    
+    O contexto nunca faz commit: só persiste o que passar por uma função do
+    crud que confirme a transação; o restante é descartado junto com a sessão.
+    """
+    session = SessionLocal()
+    try:
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+
+
+def _is_fragment_rerun() -> bool:
+    """Indica se a execução atual reexecuta apenas fragmentos (sem passar por main)"""
+    return bool(getattr(get_script_run_ctx(), "fragment_ids_this_run", None))
+
+
+def _fragment(func):
+    """
+    Fragmento que descarta a sessão do banco ao fim de uma reexecução isolada
+    
+    Quando o fragmento roda dentro do run completo a sessão continua
+    compartilhada com as demais abas e é descartada por main (ver _db_session).
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if _is_fragment_rerun():
+                SessionLocal.remove()
+    return _st_fragment(wrapper)
+
+
+@functools.lru_cache(maxsize=None)
+def _has_statsmodels() -> bool:
+    """Verifica se o statsmodels (linha de tendência OLS) está disponível sem importá-lo"""
+    return importlib.util.find_spec("statsmodels") is not None
+
+
+def _column_bytes(series: pd.Series) -> bytes:
+    """Serializa uma coluna numérica como float64 contíguo (chave barata para o cache)"""
+    return np.ascontiguousarray(series.to_numpy(dtype=np.float64)).tobytes()
+
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    Correlação de Pearson entre dois arrays, ignorando pares com NaN (como `Series.corr`)
+    
+    Usa os desvios centrados e três produtos escalares, sem montar a matriz de
+    covariância de np.corrcoef.
+    
+    Args:
+        x: Primeiro array
+        y: Segundo array
+        
+    Returns:
+        Coeficiente de correlação (NaN se houver menos de 2 pares ou variância nula)
+    """
+    mask = np.isfinite(x) & np.isfinite(y)
+    if mask.sum() < 2:
+        return float('nan')
+    if not mask.all():
+        x, y = x[mask], y[mask]
+    xm = x - x.mean()
+    ym = y - y.mean()
+    denominator = np.sqrt(xm @ xm) * np.sqrt(ym @ ym)
+    if denominator == 0:
+        return float('nan')
+    return float(xm @ ym / denominator)
+
+
+# Percentis das tabelas de resultados (resumo e detalhados)
+_SHORT_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+_DETAILED_PERCENTILES = (1, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80, 85, 90, 95, 99)
+# Rótulos, chaves de describe() e estilo das linhas montados uma única vez
+_DETAILED_LABELS = np.array([f'P{p}' for p in _DETAILED_PERCENTILES])
+_DETAILED_KEYS = [f'{p}%' for p in _DETAILED_PERCENTILES]
+_SHORT_ROW_STYLE = np.where(np.isin(_DETAILED_PERCENTILES, _SHORT_PERCENTILES),
+                            'font-weight: bold; background-color: #e8f0fe', '')
+_DESCRIBE_INDEX = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _sorted_column(values: bytes) -> np.ndarray:
+    """Valores finitos da coluna ordenados uma única vez (ver _column_bytes)"""
+    data = np.frombuffer(values, dtype=np.float64)
+    return np.sort(data[~np.isnan(data)])
+
+
+def _sorted_quantiles(sorted_values: np.ndarray, quantiles: np.ndarray) -> np.ndarray:
+    """Quantis por interpolação linear (mesmo método de np.percentile) sobre valores já ordenados"""
+    if len(sorted_values) == 0:
+        return np.full(len(quantiles), np.nan)
+    position = quantiles * (len(sorted_values) - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _describe_column(values: bytes, name: str) -> pd.Series:
+    """
+    Estatísticas descritivas e todos os percentis exibidos de uma coluna
+    
+    A coluna é ordenada uma única vez (_sorted_column); mínimo, máximo e
+    percentis são lidos diretamente do vetor ordenado.
+    
+    Args:
+        values: Bytes da coluna (ver _column_bytes)
+        name: Nome da coluna
+        
+    Returns:
+        Série no formato de describe(), com os rótulos '<p>%' de todos os
+        percentis de _SHORT_PERCENTILES e _DETAILED_PERCENTILES
+    """
+    percentiles = sorted(set(_SHORT_PERCENTILES) | set(_DETAILED_PERCENTILES))
+    sorted_values = _sorted_column(values)
+    count = len(sorted_values)
+    summary = {
+        'count': float(count),
+        'mean': sorted_values.mean() if count else np.nan,
+        'std': sorted_values.std(ddof=1) if count > 1 else np.nan,
+        'min': sorted_values[0] if count else np.nan,
+    }
+    quantiles = _sorted_quantiles(sorted_values, np.asarray(percentiles) / 100)
+    summary.update({f'{p}%': value for p, value in zip(percentiles, quantiles)})
+    summary['max'] = sorted_values[-1] if count else np.nan
+    return pd.Series(summary, name=name)
+
+
+def _detailed_percentiles_table(description: pd.Series):
+    """
+    Tabela única de percentis detalhados, com os percentis do resumo destacados
+    
+    Args:
+        description: Resultado de _describe_column
+        
+    Returns:
+        Styler com as linhas de _SHORT_PERCENTILES em negrito
+    """
+    percentiles_df = pd.DataFrame({
+        'Percentil': _DETAILED_LABELS,
+        'Valor': description[_DETAILED_KEYS].to_numpy()
+    })
+    return percentiles_df.style.apply(lambda col: _SHORT_ROW_STYLE)
+
+
+def _box_fig(sorted_values: np.ndarray, description: pd.Series, name: str, title: str) -> go.Figure:
+    """
+    Boxplot com o resumo de cinco números calculado no servidor
+    
+    Quartis vêm de _describe_column e as cercas seguem a regra de 1.5 * IQR
+    do Plotly; apenas os valores distintos fora das cercas vão ao navegador.
+    
+    Args:
+        sorted_values: Valores ordenados (ver _sorted_column)
+        description: Resultado de _describe_column para a mesma coluna
+        name: Nome da categoria no eixo x
+        title: Título do gráfico
+        
+    Returns:
+        Figura plotly com o box pré-calculado e os outliers
+    """
+    fig = go.Figure(layout={'title': {'text': title}, 'showlegend': False})
+    if len(sorted_values) == 0:
+        return fig
+    q1, median, q3 = description[['25%', '50%', '75%']].to_numpy()
+    iqr = q3 - q1
+    lower = np.searchsorted(sorted_values, q1 - 1.5 * iqr, side='left')
+    upper = np.searchsorted(sorted_values, q3 + 1.5 * iqr, side='right')
+    outliers = np.unique(np.concatenate([sorted_values[:lower], sorted_values[upper:]]))
+    fig.add_traces([
+        go.Box(x=[name], q1=[q1], median=[median], q3=[q3], mean=[description['mean']],
+               lowerfence=[sorted_values[lower]], upperfence=[sorted_values[upper - 1]], name=name),
+        go.Scatter(x=np.full(len(outliers), name, dtype=object), y=outliers, mode='markers', name=name),
+    ])
+    return fig
+
+
+def _ecdf_points(sorted_values: np.ndarray, max_points: int = 2000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pontos da distribuição cumulativa empírica, limitados a `max_points`
+    
+    Como a curva é monótona, a decimação uniforme dos índices é visualmente
+    idêntica à curva completa.
+    
+    Args:
+        sorted_values: Valores ordenados (ver _sorted_column)
+        max_points: Número máximo de pontos enviados ao gráfico
+        
+    Returns:
+        Tupla (x, y) com os valores e as probabilidades cumulativas
+    """
+    n = len(sorted_values)
+    if n == 0:
+        return sorted_values, np.empty(0)
+    y = np.linspace(1.0 / n, 1.0, n)
+    if n > max_points:
+        index = np.linspace(0, n - 1, max_points).astype(np.intp)
+        return sorted_values[index], y[index]
+    return sorted_values, y
+
+
+@st.cache_data(show_spinner=False)
+def _hist_fig(values: bytes, column: str, title: str, nbins: int) -> go.Figure:
+    """
+    Histograma com bins calculados no servidor, cacheado pelos bytes da coluna
+    
+    Só as contagens dos bins vão para o navegador, não os valores brutos;
+    centros e larguras seguem como float32 e contagens como int32.
+    
+    Args:
+        values: Bytes da coluna (ver _column_bytes)
+        column: Nome da coluna (título do eixo x)
+        title: Título do gráfico
+        nbins: Número de bins
+        
+    Returns:
+        Figura plotly com barras adjacentes
+    """
+    data = np.frombuffer(values, dtype=np.float64)
+    counts, edges = np.histogram(data[np.isfinite(data)], bins=nbins)
+    centers = (0.5 * (edges[:-1] + edges[1:])).astype(np.float32)
+    widths = np.diff(edges).astype(np.float32)
+    fig = go.Figure(go.Bar(x=centers, y=counts.astype(np.int32), width=widths))
+    fig.update_layout(title=title, xaxis_title=column, yaxis_title="count", bargap=0)
+    return fig
+
+
+def _resample_index(x: np.ndarray, y: np.ndarray, max_points: int = 5000) -> np.ndarray:
+    """
+    Índices de no máximo `max_points` pontos representativos de uma nuvem
+    
+    Os pontos são agrupados numa grade 2D de lado sqrt(max_points) e só o
+    primeiro ponto de cada célula ocupada é mantido. Regiões densas são
+    resumidas e pontos isolados (extremos) continuam visíveis.
+    
+    Args:
+        x: Valores do eixo x
+        y: Valores do eixo y
+        max_points: Número máximo de pontos
+        
+    Returns:
+        Índices dos pontos mantidos, na ordem original das linhas
+    """
+    if len(x) <= max_points:
+        return np.arange(len(x))
+    side = int(np.sqrt(max_points))
+    finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    cells = np.zeros(len(finite), dtype=np.int64)
+    for values in (x[finite], y[finite]):
+        low, high = values.min(), values.max()
+        span = high - low if high > low else 1.0
+        cells = cells * side + np.minimum(((values - low) / span * side).astype(np.int64), side - 1)
+    _, first = np.unique(cells, return_index=True)
+    return finite[np.sort(first)]
+
+
+def _maybe_resample(x: np.ndarray, y: np.ndarray, max_points: int = 5000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduz uma nuvem de pontos a no máximo `max_points` pontos (ver _resample_index)
+    
+    Args:
+        x: Valores do eixo x
+        y: Valores do eixo y
+        max_points: Número máximo de pontos
+        
+    Returns:
+        Tupla (x, y) com os pontos mantidos
+    """
+    if len(x) <= max_points:
+        return x, y
+    index = _resample_index(x, y, max_points)
+    return x[index], y[index]
+
+
+@st.cache_data(show_spinner=False)
+def _scattergl_fig(x_values: bytes, y_values: bytes, x: str, y: str, title: str,
+                   hovertext: Optional[tuple] = None) -> go.Figure:
+    """
+    Dispersão WebGL reduzida acima de 5000 pontos, cacheada pelos bytes das colunas
+    
+    Args:
+        x_values: Bytes da coluna do eixo x
+        y_values: Bytes da coluna do eixo y
+        x: Nome da coluna do eixo x
+        y: Nome da coluna do eixo y
+        title: Título do gráfico
+        hovertext: Rótulos exibidos no hover, um por ponto (opcional)
+        
+    Returns:
+        Figura plotly
+    """
+    x_arr = np.frombuffer(x_values, dtype=np.float64)
+    y_arr = np.frombuffer(y_values, dtype=np.float64)
+    index = _resample_index(x_arr, y_arr)
+    labels = None if hovertext is None else np.asarray(hovertext, dtype=object)[index]
+    fig = go.Figure(go.Scattergl(x=x_arr[index], y=y_arr[index], mode='markers', hovertext=labels))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def _scatter_fig(x_values: bytes, y_values: bytes, x: str, y: str, title: str,
+                 trendline: Optional[str] = None) -> go.Figure:
+    """
+    Gráfico de dispersão cacheado pelos bytes das colunas (ver _column_bytes)
+    
+    O plotly.express só é importado aqui, na primeira figura que precisa dele
+    (linha de tendência), e não no carregamento do dashboard.
+    
+    Args:
+        x_values: Bytes da coluna do eixo x
+        y_values: Bytes da coluna do eixo y
+        x: Nome da coluna do eixo x
+        y: Nome da coluna do eixo y
+        title: Título do gráfico
+        trendline: Tipo de linha de tendência do plotly (opcional)
+        
+    Returns:
+        Figura plotly
+    """
+    import plotly.express as px
+    
+    data = pd.DataFrame({
+        x: np.frombuffer(x_values, dtype=np.float64),
+        y: np.frombuffer(y_values, dtype=np.float64)
+    })
+    return px.scatter(data, x=x, y=y, title=title, trendline=trendline)
+
+
+def _frame_key(df: pd.DataFrame) -> str:
+    """
+    Chave barata do conteúdo de um DataFrame para os caches
+    
+    Os buffers de cada coluna (e do índice) passam direto pelo blake2b, sem
+    cópia; colunas de objetos são antes convertidas em hashes por valor. Ao
+    contrário da soma de hash_pandas_object, a chave depende da ordem das linhas.
+    
+    Args:
+        df: DataFrame a identificar
+        
+    Returns:
+        Digest hexadecimal do conteúdo
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((df.shape, list(df.columns), [str(dtype) for dtype in df.dtypes])).encode())
+    columns = [df.index.to_numpy()] + [df.iloc[:, i].to_numpy() for i in range(df.shape[1])]
+    for values in columns:
+        if values.dtype.kind == 'O':
+            values = pd.util.hash_array(values)
+        digest.update(np.ascontiguousarray(values).view(np.uint8))
+    return digest.hexdigest()
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _df_to_csv_bytes(_df: pd.DataFrame, df_key: str) -> bytes:
+    """
+    Gera o CSV completo (bytes UTF-8) uma única vez por conteúdo do DataFrame (ver _frame_key)
+    
+    O CSV é escrito em blocos direto em um buffer de bytes, sem a string
+    intermediária do to_csv() nem o encode de uma segunda cópia.
+    """
+    buffer = io.BytesIO()
+    _df.to_csv(buffer, index=False, encoding='utf-8', chunksize=50_000)
+    return buffer.getvalue()
+
+
+def _summary_stats(theta_values: bytes, enem_values: bytes) -> dict:
+    """
+    Estatísticas de theta e nota ENEM lidas das descrições cacheadas
+    
+    Mínimo, máximo e mediana saem do vetor já ordenado por _describe_column,
+    e média/desvio são calculados uma única vez por coluna, sem novas
+    reduções sobre o DataFrame a cada rerun.
+    
+    Args:
+        theta_values: Bytes da coluna theta (ver _column_bytes)
+        enem_values: Bytes da coluna enem_score (ver _column_bytes)
+        
+    Returns:
+        Dicionário com theta_/enem_ mean, std, min, max e median
+    """
+    labels = {'mean': 'mean', 'std': 'std', 'min': 'min', 'max': 'max', 'median': '50%'}
+    stats = {}
+    for prefix, values, name in (('theta', theta_values, 'theta'), ('enem', enem_values, 'enem_score')):
+        description = _describe_column(values, name)
+        stats.update({f"{prefix}_{stat}": float(description[label]) for stat, label in labels.items()})
+    return stats
+
+
+@st.cache_resource(show_spinner=False)
+def _shared_components() -> dict:
+    """
+    Motores e utilitários do sistema, criados uma única vez por processo
+    
+    Não guardam estado por sessão, então são compartilhados entre reruns e
+    sessões em vez de reconstruídos a cada interação.
+    
+    Returns:
+        Dicionário com tri_engine, data_processor, validator, calibrator e config
+    """
+    return {
+        'tri_engine': TRIEngine(),
+        'data_processor': DataProcessor(),
+        'validator': DataValidator(),
+        'calibrator': ItemCalibrator(),
+        'config': get_config(),
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def _ensure_save_dir() -> Path:
+    """Cria o diretório de resultados salvos uma única vez por processo"""
+    save_dir = Path("saved_results")
+    save_dir.mkdir(exist_ok=True)
+    return save_dir
+
+
+@st.cache_resource(show_spinner=False)
+def _ensure_schema() -> bool:
+    """Cria as tabelas do banco uma única vez por processo (falhas não ficam em cache)"""
+    Base.metadata.create_all(bind=engine)
+    return True
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _list_parameter_sets() -> list:
+    """Lista os conjuntos de parâmetros salvos (metadados mudam pouco; cache de 30s)"""
+    with _db_session() as session:
+        return crud.list_parameter_sets(session)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _list_parameters_sets() -> list:
+    """Conjuntos de parâmetros com total de itens para a aba de parâmetros salvos (cache de 30s)"""
+    with _db_session() as session:
+        return crud.list_parameters_sets(session)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _list_executions() -> list:
+    """Execuções salvas com métricas resumidas para a aba de histórico (cache de 30s)"""
+    with _db_session() as session:
+        return crud.list_executions(session)
+
+
+def _parse_csv(data: bytes, nrows: Optional[int] = None) -> pd.DataFrame:
+    """Lê o CSV de respostas enviado (apenas as `nrows` primeiras linhas, se informado)"""
+    if nrows is not None:
+        return read_csv_utf8(io.BytesIO(data), sep=';', nrows=nrows)
+    return read_csv_utf8(io.BytesIO(data), sep=';')
+
+
+def _parse_excel(processor: DataProcessor, data: bytes, name: str) -> pd.DataFrame:
+    """Processa o Excel de respostas enviado"""
+    buffer = io.BytesIO(data)
+    buffer.name = name
+    return processor.load_responses_excel_from_streamlit(buffer)
+
+
+@st.cache_data(show_spinner=False)
+def _load_uploaded_responses(_processor: DataProcessor, data: bytes, name: str) -> tuple:
+    """
+    Lê, normaliza e valida o arquivo de respostas uma única vez por conteúdo
+    
+    A chave do cache são os bytes e o nome do arquivo; nos reruns seguintes
+    não há nova leitura, nem hash do DataFrame, nem nova validação.
+    
+    Args:
+        _processor: DataProcessor usado na leitura e validação (não entra na chave do cache)
+        data: Bytes do arquivo enviado
+        name: Nome do arquivo (define o formato: .xlsx ou CSV)
+    
+    Returns:
+        Tupla (DataFrame, métricas), pois a validação pode adicionar a coluna Acerto
+    """
+    if name.endswith('.xlsx'):
+        df = _parse_excel(_processor, data, name)
+    else:
+        df = _parse_csv(data)
+    
+    # Acerto 0/1 em int8: 8x menos memória nas reduções seguintes
+    if 'Acerto' in df.columns and pd.api.types.is_integer_dtype(df['Acerto']) \
+            and df['Acerto'].between(0, 1).all():
+        df['Acerto'] = df['Acerto'].astype(np.int8)
+    
+    # Identificadores compactos: CodPessoa se repete a cada item (categoria) e
+    # Questao cabe em inteiros pequenos; nunique/factorize passam a operar
+    # sobre códigos inteiros
+    if 'CodPessoa' in df.columns:
+        df['CodPessoa'] = df['CodPessoa'].astype('category')
+    if 'Questao' in df.columns and pd.api.types.is_integer_dtype(df['Questao']):
+        df['Questao'] = pd.to_numeric(df['Questao'], downcast='integer')
+    
+    # Alternativas e gabarito com as mesmas categorias, para que a comparação
+    # RespostaAluno == Gabarito continue válida entre as duas colunas
+    if 'RespostaAluno' in df.columns and 'Gabarito' in df.columns:
+        alternatives = pd.CategoricalDtype(
+            pd.concat([df['RespostaAluno'], df['Gabarito']]).dropna().unique()
+        )
+        df['RespostaAluno'] = df['RespostaAluno'].astype(alternatives)
+        df['Gabarito'] = df['Gabarito'].astype(alternatives)
+    
+    metrics = _processor.validate_data_quality(df)
+    return df, metrics
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _load_results_from_db(execution_id: int) -> pd.DataFrame:
+    """
+    Carrega os resultados de uma execução do banco
+    
+    O DataFrame é compartilhado por referência entre reruns (sem cópia nem
+    hash do conteúdo), portanto não deve ser modificado pelos chamadores.
+    
+    Args:
+        execution_id: ID da execução
+        
+    Returns:
+        DataFrame com os resultados da execução
+    """
+    with _db_session() as session:
+        df = crud.get_execution_results(session, execution_id)
+    
+    # Converter nomes das colunas para compatibilidade
+    if 'Theta' in df.columns and 'theta' not in df.columns:
+        df['theta'] = df['Theta']
+    if 'Nota_ENEM' in df.columns and 'enem_score' not in df.columns:
+        df['enem_score'] = df['Nota_ENEM']
+    return df
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _execution_csv_bytes(execution_id: int) -> bytes:
+    """CSV dos resultados de uma execução, gerado uma vez por ID direto em um buffer de bytes"""
+    buffer = io.BytesIO()
+    _load_results_from_db(execution_id).to_csv(buffer, index=False, encoding='utf-8')
+    return buffer.getvalue()
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _parameters_set_csv_bytes(parameters_set_id: int) -> bytes:
+    """CSV dos parâmetros de um conjunto salvo, gerado uma vez por ID direto em um buffer de bytes"""
+    with _db_session() as session:
+        params_df = crud.get_parameters_set(session, parameters_set_id)
+    buffer = io.BytesIO()
+    params_df.to_csv(buffer, index=False, encoding='utf-8')
+    return buffer.getvalue()
+
+
 class TRIDashboard:
     """
     Dashboard web para o sistema TRI
     """
     
     def __init__(self):
-        self.tri_engine = TRIEngine()
-        self.data_processor = DataProcessor()
-        self.validator = DataValidator()
-        self.calibrator = ItemCalibrator()
-        self.visualizer = TRIVisualizer()
-        self.config = get_config()
-        self.chart_counter = 0
-        
-        # Garantir que as tabelas do banco existam
+        components = _shared_components()
+        self.tri_engine = components['tri_engine']
+        self.data_processor = components['data_processor']
+        self.validator = components['validator']
+        self.calibrator = components['calibrator']
+        self.config = components['config']
+        
+        # Garantir que as tabelas do banco existam (uma vez por processo)
         try:
-            Base.metadata.create_all(bind=engine)
+            _ensure_schema()
         except Exception:
             pass
         
-        # Inicializar contador global de gráficos no session state
-        if 'global_chart_counter' not in st.session_state:
-            st.session_state['global_chart_counter'] = 0
-        
         # Configurar autenticação
         if 'authenticated' not in st.session_state:
             st.session_state['authenticated'] = False
         
         # Configurar diretório de salvamento (mantido para compatibilidade de download local)
-        self.save_dir = Path("saved_results")
-        self.save_dir.mkdir(exist_ok=True)
+        self.save_dir = _ensure_save_dir()
     
-    def get_unique_key(self, prefix: str) -> str:
-        """Gera uma chave única para elementos Streamlit"""
-        st.session_state['global_chart_counter'] += 1
-        return f"{prefix}_{st.session_state['global_chart_counter']}"
+    def get_unique_key(self, prefix: str, *parts) -> str:
+        """
+        Gera uma chave estável para elementos Streamlit
+        
+        A mesma combinação de prefixo e contexto gera a mesma chave em todos os
+        reruns, permitindo ao Streamlit reaproveitar o estado dos elementos.
+        
+        Args:
+            prefix: Prefixo que identifica o elemento
+            *parts: Contexto adicional para distinguir elementos com o mesmo prefixo
+            
+        Returns:
+            Chave no formato prefixo_hash
+        """
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+        return f"{prefix}_{digest}"
+    
+    def get_results_df(self):
+        """
+        Retorna os resultados ativos da sessão
+        
+        Resultados processados nesta sessão ficam em session_state; execuções
+        carregadas do histórico guardam apenas o ID e são obtidas do cache.
+        
+        Returns:
+            DataFrame com os resultados ou None se não houver resultados
+        """
+        if 'results_df' in st.session_state:
+            return st.session_state['results_df']
+        execution_id = st.session_state.get('current_execution_id')
+        if execution_id is not None:
+            return _load_results_from_db(execution_id)
+        return None
+    
+    def get_result_arrays(self, results_df: pd.DataFrame) -> dict:
+        """
+        Colunas theta/enem_score serializadas e ordenadas, com descrições e
+        estatísticas resumidas, mantidas no session_state
+        
+        São recalculadas apenas quando o DataFrame de resultados muda (comparação
+        por identidade; execuções do histórico vêm do cache por ID e mantêm o
+        mesmo objeto); nos demais reruns nada é reordenado nem re-hasheado.
+        
+        Args:
+            results_df: DataFrame de resultados ativo
+            
+        Returns:
+            Dicionário com theta_bytes, enem_bytes, theta_sorted, enem_sorted,
+            theta_description, enem_description e stats
+        """
+        arrays = st.session_state.get('_result_arrays')
+        if arrays is None or arrays['source'] is not results_df:
+            theta_bytes = _column_bytes(results_df['theta'])
+            enem_bytes = _column_bytes(results_df['enem_score'])
+            arrays = {
+                'source': results_df,
+                'theta_bytes': theta_bytes,
+                'enem_bytes': enem_bytes,
+                'theta_sorted': _sorted_column(theta_bytes),
+                'enem_sorted': _sorted_column(enem_bytes),
+                'theta_description': _describe_column(theta_bytes, 'theta'),
+                'enem_description': _describe_column(enem_bytes, 'enem_score'),
+                'stats': _summary_stats(theta_bytes, enem_bytes),
+            }
+            st.session_state['_result_arrays'] = arrays
+        return arrays
+    
+    def show_paginated_dataframe(self, df: pd.DataFrame, key: str, page_size: int = 200,
+                                 column_config: Optional[dict] = None):
+        """
+        Mostra um DataFrame em páginas, enviando ao navegador apenas as linhas visíveis
+        
+        Args:
+            df: DataFrame a exibir
+            key: Prefixo estável das chaves dos widgets de paginação
+            page_size: Linhas por página padrão
+            column_config: Configuração de colunas repassada ao st.dataframe (opcional)
+        """
+        page_sizes = sorted({50, 100, page_size, 500})
+        col_size, col_page = st.columns([1, 1])
+        with col_size:
+            page_size = st.selectbox("Linhas por página", page_sizes,
+                                     index=page_sizes.index(page_size), key=f"{key}_page_size")
+        total_pages = max(1, -(-len(df) // page_size))
+        with col_page:
+            page = st.number_input(f"Página (de {total_pages})", min_value=1, max_value=total_pages,
+                                   value=1, step=1, key=f"{key}_page")
+        
+        start = (int(page) - 1) * page_size
+        st.dataframe(df.iloc[start:start + page_size], use_container_width=True, column_config=column_config)
+        st.caption(f"Linhas {min(start + 1, len(df))}–{min(start + page_size, len(df))} de {len(df)}")
     
     def authenticate(self):
         """Sistema de autenticação simples"""
@@ -175,6 +824,7 @@ class TRIDashboard:
         with tab7:
             self.parameters_tab()
     
+    @_fragment
     def upload_data_tab(self):
         """Aba de upload de dados"""
         st.header("📁 Upload de Dados")
@@ -188,35 +838,43 @@ class TRIDashboard:
         
         if uploaded_file is not None:
             try:
-                # Detectar tipo de arquivo
-                if uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file, sep=';', encoding='utf-8')
-                    st.success(f"✅ CSV carregado: {len(df)} linhas, {len(df.columns)} colunas")
-                elif uploaded_file.name.endswith('.xlsx'):
-                    # Processar Excel usando DataProcessor
-                    try:
-                        df = self.data_processor.load_responses_excel_from_streamlit(uploaded_file)
-                        st.success(f"✅ Excel processado: {len(df)} linhas, {len(df.columns)} colunas")
-                    except Exception as e:
-                        st.error(f"❌ Erro ao processar Excel: {e}")
-                        st.info("💡 Verifique se o arquivo tem as abas 'Datos' e 'Matriz'")
-                        return
+                is_excel = uploaded_file.name.endswith('.xlsx')
+                data = uploaded_file.getvalue()
                 
-                # Mostrar preview
-                st.subheader("👀 Preview dos Dados")
-                st.dataframe(df.head(), use_container_width=True)
+                # Preview do CSV lido só das primeiras linhas, exibido antes da leitura completa
+                if not is_excel:
+                    st.subheader("👀 Preview dos Dados")
+                    st.dataframe(_parse_csv(data, nrows=5), use_container_width=True, hide_index=True)
+                
+                # Leitura, normalização e validação cacheadas pelos bytes do arquivo
+                try:
+                    with st.spinner("Carregando arquivo..."):
+                        df, validation_result = _load_uploaded_responses(
+                            self.data_processor, data, uploaded_file.name
+                        )
+                except Exception as e:
+                    if not is_excel:
+                        raise
+                    st.error(f"❌ Erro ao processar Excel: {e}")
+                    st.info("💡 Verifique se o arquivo tem as abas 'Datos' e 'Matriz'")
+                    return
+                if is_excel:
+                    st.success(f"✅ Excel processado: {len(df)} linhas, {len(df.columns)} colunas")
+                    
+                    # Preview do Excel já convertido para o formato de respostas
+                    st.subheader("👀 Preview dos Dados")
+                    st.dataframe(df.head(5).reset_index(drop=True), use_container_width=True, hide_index=True)
+                else:
+                    st.success(f"✅ CSV carregado: {len(df)} linhas, {len(df.columns)} colunas")
                 
                 # Validar dados
                 st.info("🔍 Validando dados...")
                 
-                # Mostrar estrutura do arquivo
+                # Mostrar estrutura do arquivo (as primeiras linhas já estão no preview acima)
                 st.write("**📋 Estrutura do arquivo:**")
                 st.write(f"- **Colunas disponíveis:** {list(df.columns)}")
                 st.write(f"- **Total de linhas:** {len(df)}")
-                st.write(f"- **Primeiras linhas:**")
-                st.dataframe(df.head(3), use_container_width=True)
                 
-                validation_result = self.data_processor.validate_data_quality(df)
                 if validation_result and len(validation_result) > 0:
                     st.success("✅ Dados validados com sucesso!")
                     
@@ -251,8 +909,14 @@ class TRIDashboard:
                                 st.metric("Total de Respostas", validation_result.get('total_responses', 0))
                                 st.metric("Alunos Incompletos", validation_result.get('incomplete_students', 0))
                     
+                    file_id = getattr(uploaded_file, 'file_id', uploaded_file.name)
+                    is_new_upload = st.session_state.get('uploaded_file_id') != file_id
                     st.session_state['uploaded_data'] = df
                     st.session_state['uploaded_filename'] = uploaded_file.name
+                    st.session_state['uploaded_file_id'] = file_id
+                    if is_new_upload:
+                        # Rerun completo para que as demais abas vejam os novos dados
+                        st.rerun()
                 else:
                     st.error("❌ Dados não passaram na validação")
                     st.info("💡 **Formato Excel esperado:**")
@@ -287,11 +951,7 @@ class TRIDashboard:
             if source == "Arquivo de Âncoras (CSV)":
                 anchor_file = st.file_uploader("Arquivo de itens âncora (CSV)", type=['csv'])
             else:
-                try:
-                    session = SessionLocal()
-                    sets = crud.list_parameter_sets(session)
-                finally:
-                    session.close()
+                sets = _list_parameter_sets()
                 if not sets:
                     st.info("Nenhum conjunto salvo. Faça upload de parâmetros ou calibre e salve.")
                 else:
@@ -306,6 +966,7 @@ class TRIDashboard:
             ])        
         
         # Botão principal da aba: calibrar (a partir de âncoras opcionais) ou carregar conjunto salvo
+        calibration_shown = False
         if st.button("Aplicar Parâmetros / Calibrar", type="primary"):
             with st.spinner("Calibrando parâmetros dos itens..."):
                 try:
@@ -313,15 +974,19 @@ class TRIDashboard:
                     anchor_items = None
                     if source == "Arquivo de Âncoras (CSV)" and anchor_file is not None:
                         try:
-                            try:
-                                anchor_df = pd.read_csv(anchor_file)
-                            except:
-                                anchor_file.seek(0)
-                                anchor_df = pd.read_csv(anchor_file, sep=';')
-                            anchor_items = {}
-                            for _, row in anchor_df.iterrows():
-                                questao = int(row['Questao'])
-                                anchor_items[questao] = {'a': float(row['a']), 'b': float(row['b']), 'c': float(row['c'])}
+                            # Separador detectado uma vez no início do arquivo, sem reler o CSV
+                            head = anchor_file.read(4096)
+                            anchor_file.seek(0)
+                            sep = ';' if head.count(b';') > head.count(b',') else ','
+                            anchor_df = pd.read_csv(anchor_file, sep=sep)
+                            questoes = anchor_df['Questao'].to_numpy(dtype=np.int64)
+                            a_values = anchor_df['a'].to_numpy(dtype=np.float64)
+                            b_values = anchor_df['b'].to_numpy(dtype=np.float64)
+                            c_values = anchor_df['c'].to_numpy(dtype=np.float64)
+                            anchor_items = {
+                                int(q): {'a': float(a), 'b': float(b), 'c': float(c)}
+                                for q, a, b, c in zip(questoes, a_values, b_values, c_values)
+                            }
                             st.success(f"✅ {len(anchor_items)} itens âncora carregados")
                         except Exception as e:
                             st.error(f"❌ Erro ao carregar itens âncora: {e}")
@@ -330,14 +995,11 @@ class TRIDashboard:
 
                     if source == "Conjunto Salvo" and selected_param_set_id is not None:
                         # Carregar parâmetros salvos como params_df
-                        try:
-                            session = SessionLocal()
+                        with _db_session() as session:
                             params_df = crud.get_parameter_set_items(session, selected_param_set_id)
-                            st.session_state['parameters_set_id'] = selected_param_set_id
-                            st.session_state['params_df'] = params_df
-                            st.success(f"✅ Conjunto de parâmetros carregado (id={selected_param_set_id})")
-                        finally:
-                            session.close()
+                        st.session_state['parameters_set_id'] = selected_param_set_id
+                        st.session_state['params_df'] = params_df
+                        st.success(f"✅ Conjunto de parâmetros carregado (id={selected_param_set_id})")
 
                     # Se não selecionou conjunto salvo, calibrar
                     if params_df is None:
@@ -350,21 +1012,24 @@ class TRIDashboard:
                             st.success("✅ Calibração concluída com sucesso!")
                             # Marcar âncoras
                             if anchor_items:
-                                calibrated_params = calibrated_params.copy()
-                                calibrated_params['is_anchor'] = calibrated_params['type'].eq('anchor') if 'type' in calibrated_params.columns else False
+                                # assign cria o novo frame já com a coluna, sem a cópia prévia
+                                is_anchor = (calibrated_params['type'].to_numpy() == 'anchor'
+                                             if 'type' in calibrated_params.columns else False)
+                                calibrated_params = calibrated_params.assign(is_anchor=is_anchor)
                             # Persistir
-                            try:
-                                session = SessionLocal()
-                                required_cols = ['Questao','a','b','c']
-                                calib_df = calibrated_params[required_cols + (['is_anchor'] if 'is_anchor' in calibrated_params.columns else [])] if all(col in calibrated_params.columns for col in required_cols) else calibrated_params
+                            required_cols = ['Questao','a','b','c']
+                            calib_df = calibrated_params[required_cols + (['is_anchor'] if 'is_anchor' in calibrated_params.columns else [])] if all(col in calibrated_params.columns for col in required_cols) else calibrated_params
+                            with _db_session() as session:
                                 param_set = crud.create_parameters_set(session, name=f"calibrated:{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}", is_anchor=False, params_df=calib_df)
-                                st.session_state['parameters_set_id'] = param_set.id
-                                st.info(f"💾 Parâmetros calibrados persistidos (id={param_set.id})")
-                            finally:
-                                session.close()
+                                param_set_id = param_set.id
+                            _list_parameter_sets.clear()
+                            _list_parameters_sets.clear()
+                            st.session_state['parameters_set_id'] = param_set_id
+                            st.info(f"💾 Parâmetros calibrados persistidos (id={param_set_id})")
                             # Mostrar resultados
                             self.show_calibration_results(calibrated_params, validation)
-                            csv = calibrated_params.to_csv(index=False)
+                            calibration_shown = True
+                            csv = _df_to_csv_bytes(calibrated_params, _frame_key(calibrated_params))
                             # Gerar chave única baseada no hash dos dados para evitar duplicação
                             csv_hash = hash(csv) % 1000000
                             st.download_button(label="📥 Download Parâmetros Calibrados (CSV)", data=csv, file_name="parametros_calibrados.csv", mime="text/csv", key=f"download_calibrated_params_{csv_hash}")
@@ -380,8 +1045,8 @@ class TRIDashboard:
                 except Exception as e:
                     st.error(f"❌ Erro na calibração: {e}")
         
-        # Mostrar resultados se disponíveis
-        if 'calibrated_params' in st.session_state:
+        # Mostrar resultados se disponíveis (e ainda não exibidos neste rerun)
+        if 'calibrated_params' in st.session_state and not calibration_shown:
             self.show_calibration_results(st.session_state['calibrated_params'])
     
     def tri_processing_tab(self):
@@ -407,7 +1072,8 @@ class TRIDashboard:
         
         # Verificar se temos dados para processar
         has_uploaded_data = 'uploaded_data' in st.session_state
-        has_results = 'results_df' in st.session_state
+        loaded_results = self.get_results_df()
+        has_results = loaded_results is not None
         has_params = 'params_df' in st.session_state or 'calibrated_params' in st.session_state
         
         if not has_uploaded_data and not has_results:
@@ -420,7 +1086,7 @@ class TRIDashboard:
         
         # Mostrar informações sobre dados carregados
         if has_results:
-            results_df = st.session_state['results_df']
+            results_df = loaded_results
             execution_info = ""
             if 'current_execution_id' in st.session_state:
                 execution_info = f" (Execução #{st.session_state['current_execution_id']})"
@@ -462,47 +1128,44 @@ class TRIDashboard:
                     # Salvar resultados
                     st.session_state['results_df'] = results_df
                     
-                    # Persistir no banco
+                    # Persistir no banco (a sessão do thread é descartada ao fim da execução, em main/_fragment)
                     try:
-                        session = SessionLocal()
-                        
-                        # Criar dataset
-                        dataset = crud.create_dataset(
-                            session, 
-                            name=st.session_state.get('uploaded_filename', 'Dataset'),
-                            source_type='csv',
-                            file_name=st.session_state.get('uploaded_filename', 'unknown.csv')
-                        )
-                        
-                        # Criar execução
-                        execution = crud.create_execution(
-                            session,
-                            dataset_id=dataset.id,
-                            parameters_set_id=st.session_state.get('parameters_set_id'),
-                            status='completed'
-                        )
-                        
-                        # Salvar resultados
-                        crud.bulk_insert_results(session, execution.id, results_df)
-                        
-                        st.success(f"✅ Processamento concluído! {len(results_df)} alunos processados")
-                        st.info(f"🔎 Resultados armazenados no banco para execução id={execution.id}")
-                        
+                        with _db_session() as session:
+                            
+                            # Criar dataset
+                            dataset = crud.create_dataset(
+                                session, 
+                                name=st.session_state.get('uploaded_filename', 'Dataset'),
+                                source_type='csv',
+                                file_name=st.session_state.get('uploaded_filename', 'unknown.csv')
+                            )
+                            
+                            # Criar execução
+                            execution = crud.create_execution(
+                                session,
+                                dataset_id=dataset.id,
+                                parameters_set_id=st.session_state.get('parameters_set_id'),
+                                status='completed'
+                            )
+                            
+                            # Salvar resultados
+                            crud.bulk_insert_results(session, execution.id, results_df)
+                            _list_executions.clear()
+                            
+                            st.success(f"✅ Processamento concluído! {len(results_df)} alunos processados")
+                            st.info(f"🔎 Resultados armazenados no banco para execução id={execution.id}")
+                            
                     except Exception as e:
                         st.error(f"❌ Erro ao salvar no banco: {e}")
-                    finally:
-                        session.close()
-                    
-                    # Mostrar resultados
-                    self.show_tri_results(results_df)
                     
                 except Exception as e:
                     st.error(f"❌ Erro no processamento TRI: {e}")
         
-        # Mostrar resultados se disponíveis (apenas se não foram processados agora)
+        # Mostrar resultados se disponíveis (inclusive os processados agora, uma única vez)
         if 'results_df' in st.session_state and not has_results:
             self.show_tri_results(st.session_state['results_df'])
     
+    @_fragment
     def visualizations_tab(self):
         """Aba de análise e visualizações"""
         st.header("📈 Visualizações e Análises")
@@ -513,12 +1176,11 @@ class TRIDashboard:
         # st.write(f"current_execution_name presente: {'current_execution_name' in st.session_state}")
         
         # Verificar se temos resultados para visualizar
-        if 'results_df' not in st.session_state:
+        results_df = self.get_results_df()
+        if results_df is None:
             st.warning("⚠️ Execute o processamento TRI primeiro ou carregue resultados do histórico")
             return
         
-        results_df = st.session_state['results_df']
-        
         # Mostrar informações sobre dados carregados
         execution_info = ""
         if 'current_execution_id' in st.session_state:
@@ -536,22 +1198,20 @@ class TRIDashboard:
         # Estatísticas básicas
         st.subheader("📊 Estatísticas Descritivas")
         
+        stats = self.get_result_arrays(results_df)['stats']
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.metric("Total de Alunos", len(results_df))
         
         with col2:
-            theta_mean = results_df['theta'].mean()
-            st.metric("Theta Médio", f"{theta_mean:.3f}")
+            st.metric("Theta Médio", f"{stats['theta_mean']:.3f}")
         
         with col3:
-            enem_mean = results_df['enem_score'].mean()
-            st.metric("Nota ENEM Média", f"{enem_mean:.1f}")
+            st.metric("Nota ENEM Média", f"{stats['enem_mean']:.1f}")
         
         with col4:
-            theta_std = results_df['theta'].std()
-            st.metric("Desvio Padrão Theta", f"{theta_std:.3f}")
+            st.metric("Desvio Padrão Theta", f"{stats['theta_std']:.3f}")
         
         # Gráficos
         st.subheader("📈 Gráficos")
@@ -560,51 +1220,37 @@ class TRIDashboard:
         
         with col_chart1:
             # Distribuição de Theta
-            fig_theta = px.histogram(
-                results_df, 
-                x='theta',
-                title="Distribuição de Theta",
-                nbins=20
-            )
+            fig_theta = _hist_fig(_column_bytes(results_df['theta']), 'theta',
+                                  "Distribuição de Theta", 20)
             st.plotly_chart(fig_theta, use_container_width=True)
         
         with col_chart2:
             # Distribuição de Notas ENEM
-            fig_enem = px.histogram(
-                results_df, 
-                x='enem_score',
-                title="Distribuição de Notas ENEM",
-                nbins=20
-            )
+            fig_enem = _hist_fig(_column_bytes(results_df['enem_score']), 'enem_score',
+                                 "Distribuição de Notas ENEM", 20)
             st.plotly_chart(fig_enem, use_container_width=True)
         
-        # Scatter plot Theta vs ENEM
-        try:
-            fig_scatter = px.scatter(
-                results_df,
-                x='theta',
-                y='enem_score',
-                title="Correlação: Theta vs Nota ENEM",
-                trendline="ols"
-            )
-        except ImportError:
-            # Fallback sem trendline se statsmodels não estiver disponível
-            fig_scatter = px.scatter(
-                results_df,
-                x='theta',
-                y='enem_score',
-                title="Correlação: Theta vs Nota ENEM"
-            )
+        # Scatter plot Theta vs ENEM (statsmodels só é importado pelo plotly se instalado)
+        trendline = "ols" if _has_statsmodels() else None
+        fig_scatter = _scatter_fig(
+            _column_bytes(results_df['theta']),
+            _column_bytes(results_df['enem_score']),
+            'theta',
+            'enem_score',
+            "Correlação: Theta vs Nota ENEM",
+            trendline=trendline
+        )
+        if trendline is None:
             st.info("ℹ️ Linha de tendência não disponível (statsmodels não instalado)")
         
         st.plotly_chart(fig_scatter, use_container_width=True)
         
         # Tabela de resultados
         st.subheader("📋 Tabela de Resultados")
-        st.dataframe(results_df, use_container_width=True)
+        self.show_paginated_dataframe(results_df, "viz_results")
         
-        # Download dos resultados
-        csv_data = results_df.to_csv(index=False)
+        # Download dos resultados (CSV completo, cacheado)
+        csv_data = _df_to_csv_bytes(results_df, _frame_key(results_df))
         # Gerar chave única baseada no hash dos dados para evitar duplicação
         data_hash = hash(csv_data) % 1000000  # Usar apenas os últimos 6 dígitos
         st.download_button(
@@ -615,18 +1261,26 @@ class TRIDashboard:
             key=f"download_tri_results_main_{data_hash}"
         )
 
+    @_fragment
     def show_calibration_results(self, calibrated_params, validation=None, show_validation=True):
         """Mostra resultados da calibração"""
         # Estatísticas básicas
         col1, col2, col3, col4 = st.columns(4)
         
+        # Contagem por tipo em uma única passada
+        if 'type' in calibrated_params.columns:
+            type_counts = calibrated_params['type'].value_counts()
+            anchor_count = int(type_counts.get('anchor', 0))
+            calibrated_count = int(type_counts.get('calibrated', 0))
+        else:
+            anchor_count = 0
+            calibrated_count = len(calibrated_params)
+        
         with col1:
             st.metric("Total de Itens", len(calibrated_params))
         with col2:
-            anchor_count = len(calibrated_params[calibrated_params['type'] == 'anchor']) if 'type' in calibrated_params.columns else 0
             st.metric("Itens Âncora", anchor_count)
         with col3:
-            calibrated_count = len(calibrated_params[calibrated_params['type'] == 'calibrated']) if 'type' in calibrated_params.columns else len(calibrated_params)
             st.metric("Itens Calibrados", calibrated_count)
         with col4:
             st.metric("Parâmetro 'a' Médio", f"{calibrated_params['a'].mean():.3f}")
@@ -636,20 +1290,20 @@ class TRIDashboard:
         
         with col1:
             # Histograma do parâmetro 'a'
-            fig_a = px.histogram(calibrated_params, x='a', nbins=20,
-                               title="Distribuição do Parâmetro 'a' (Discriminação)")
+            fig_a = _hist_fig(_column_bytes(calibrated_params['a']), 'a',
+                              "Distribuição do Parâmetro 'a' (Discriminação)", 20)
             st.plotly_chart(fig_a, use_container_width=True, key=self.get_unique_key("hist_a_calibration"))
         
         with col2:
             # Histograma do parâmetro 'b'
-            fig_b = px.histogram(calibrated_params, x='b', nbins=20,
-                               title="Distribuição do Parâmetro 'b' (Dificuldade)")
+            fig_b = _hist_fig(_column_bytes(calibrated_params['b']), 'b',
+                              "Distribuição do Parâmetro 'b' (Dificuldade)", 20)
             st.plotly_chart(fig_b, use_container_width=True, key=self.get_unique_key("hist_b_calibration"))
         
         # Scatter plot a vs b
-        fig_scatter = px.scatter(calibrated_params, x='b', y='a', 
-                               title="Parâmetro 'a' vs 'b'",
-                               hover_data=['Questao'])
+        fig_scatter = _scattergl_fig(_column_bytes(calibrated_params['b']), _column_bytes(calibrated_params['a']),
+                                     'b', 'a', "Parâmetro 'a' vs 'b'",
+                                     hovertext=tuple(f"Questao {q}" for q in calibrated_params['Questao'].tolist()))
         st.plotly_chart(fig_scatter, use_container_width=True, key=self.get_unique_key("scatter_ab_calibration"))
         
         # Tabela de resultados
@@ -665,18 +1319,18 @@ class TRIDashboard:
         📊 **Para ver o theta dos alunos**, vá para a aba **"📊 Processamento TRI"** e processe os dados com estes parâmetros.
         """)
         
-        # Adicionar coluna de tipo se não existir
-        display_df = calibrated_params.copy()
-        if 'type' not in display_df.columns:
-            display_df['type'] = 'calibrated'
-        
-        # Colorir itens âncora
-        def color_anchor(val):
-            if val == 'anchor':
-                return 'background-color: lightblue'
-            return ''
-        
-        st.dataframe(display_df.style.map(color_anchor, subset=['type']))
+        # Adicionar colunas de tipo e de âncora (assign já devolve uma cópia)
+        if 'type' in calibrated_params.columns:
+            display_df = calibrated_params.assign(is_anchor=calibrated_params['type'].to_numpy() == 'anchor')
+        else:
+            display_df = calibrated_params.assign(type='calibrated', is_anchor=False)
+        
+        # Itens âncora marcados por checkbox em vez de Styler: a tabela segue
+        # virtualizada e paginada, sem CSS por célula
+        self.show_paginated_dataframe(
+            display_df, "calibration_table",
+            column_config={'is_anchor': st.column_config.CheckboxColumn("Âncora")}
+        )
         
         # Validação se fornecida
         if validation and show_validation:
@@ -685,20 +1339,33 @@ class TRIDashboard:
                 for warning in validation['warnings']:
                     st.warning(f"• {warning}")
     
+    @_fragment
     def show_tri_results(self, results_df):
         """Mostra resultados do processamento com sub-abas organizadas"""
+        # Colunas serializadas e ordenadas reaproveitadas entre reruns (ver get_result_arrays)
+        arrays = self.get_result_arrays(results_df)
+        theta_bytes = arrays['theta_bytes']
+        enem_bytes = arrays['enem_bytes']
+        stats = arrays['stats']
+        theta_arr = np.frombuffer(theta_bytes, dtype=np.float64)
+        enem_arr = np.frombuffer(enem_bytes, dtype=np.float64)
+        theta_description = arrays['theta_description']
+        enem_description = arrays['enem_description']
+        has_acertos = 'acertos' in results_df.columns
+        if has_acertos:
+            acertos_bytes = _column_bytes(results_df['acertos'])
+            acertos_arr = np.frombuffer(acertos_bytes, dtype=np.float64)
+            correlation = _pearson(acertos_arr, theta_arr)
+            corr_theta_enem = _pearson(theta_arr, enem_arr)
         col1, col2, col3, col4 = st.columns(4)
         with col1:
             st.metric("Total de Estudantes", len(results_df))
         with col2:
-            theta_mean = results_df['theta'].mean()
-            st.metric("Theta Médio", f"{theta_mean:.3f}")
+            st.metric("Theta Médio", f"{stats['theta_mean']:.3f}")
         with col3:
-            enem_mean = results_df['enem_score'].mean()
-            st.metric("Nota ENEM Média", f"{enem_mean:.1f}")
+            st.metric("Nota ENEM Média", f"{stats['enem_mean']:.1f}")
         with col4:
-            theta_std = results_df['theta'].std()
-            st.metric("Desvio Padrão Theta", f"{theta_std:.3f}")
+            st.metric("Desvio Padrão Theta", f"{stats['theta_std']:.3f}")
         
         # Sub-abas para organizar o conteúdo
         tab1, tab2, tab3, tab4 = st.tabs([
@@ -713,43 +1380,39 @@ class TRIDashboard:
             
             col1, col2 = st.columns(2)
             with col1:
-                fig_theta = px.histogram(results_df, x='theta', nbins=30, 
-                                        title="Distribuição de Theta")
+                fig_theta = _hist_fig(theta_bytes, 'theta',
+                                      "Distribuição de Theta", 30)
                 st.plotly_chart(fig_theta, use_container_width=True, key=self.get_unique_key("hist_theta_processing"))
             with col2:
-                fig_enem = px.histogram(results_df, x='enem_score', nbins=30,
-                                       title="Distribuição de Notas ENEM")
+                fig_enem = _hist_fig(enem_bytes, 'enem_score',
+                                     "Distribuição de Notas ENEM", 30)
                 st.plotly_chart(fig_enem, use_container_width=True, key=self.get_unique_key("hist_enem_processing"))
         
             # Boxplots
             col1, col2 = st.columns(2)
             with col1:
-                fig_box_theta = px.box(results_df, y='theta', title="Boxplot de Theta")
+                fig_box_theta = _box_fig(arrays['theta_sorted'], theta_description, 'theta', "Boxplot de Theta")
                 st.plotly_chart(fig_box_theta, use_container_width=True, key=self.get_unique_key("box_theta_dist"))
             with col2:
-                fig_box_enem = px.box(results_df, y='enem_score', title="Boxplot de Notas ENEM")
+                fig_box_enem = _box_fig(arrays['enem_sorted'], enem_description, 'enem_score', "Boxplot de Notas ENEM")
                 st.plotly_chart(fig_box_enem, use_container_width=True, key=self.get_unique_key("box_enem_dist"))
             
             # Distribuição cumulativa
             st.subheader("📈 Distribuição Cumulativa")
-            fig_cumulative = go.Figure()
-            
-            # Theta
-            sorted_theta = np.sort(results_df['theta'])
-            y_theta = np.arange(1, len(sorted_theta) + 1) / len(sorted_theta)
-            fig_cumulative.add_trace(go.Scatter(x=sorted_theta, y=y_theta, 
-                                               name='Theta', mode='lines'))
+            sorted_theta, y_theta = _ecdf_points(arrays['theta_sorted'])
+            sorted_enem, y_enem = _ecdf_points(arrays['enem_sorted'])
             
-            # ENEM
-            sorted_enem = np.sort(results_df['enem_score'])
-            y_enem = np.arange(1, len(sorted_enem) + 1) / len(sorted_enem)
-            fig_cumulative.add_trace(go.Scatter(x=sorted_enem, y=y_enem, 
-                                               name='ENEM', mode='lines'))
-            
-            fig_cumulative.update_layout(
-                title="Distribuição Cumulativa",
-                xaxis_title="Valor",
-                yaxis_title="Probabilidade Cumulativa"
+            # Traços e layout montados de uma vez, sem add_trace/update_layout incrementais
+            fig_cumulative = go.Figure(
+                data=[
+                    {'type': 'scattergl', 'x': sorted_theta, 'y': y_theta, 'name': 'Theta', 'mode': 'lines'},
+                    {'type': 'scattergl', 'x': sorted_enem, 'y': y_enem, 'name': 'ENEM', 'mode': 'lines'},
+                ],
+                layout={
+                    'title': {'text': "Distribuição Cumulativa"},
+                    'xaxis': {'title': {'text': "Valor"}},
+                    'yaxis': {'title': {'text': "Probabilidade Cumulativa"}},
+                }
             )
             st.plotly_chart(fig_cumulative, use_container_width=True, key=self.get_unique_key("cumulative_dist"))
         
@@ -759,64 +1422,38 @@ class TRIDashboard:
             col1, col2 = st.columns(2)
             with col1:
                 st.subheader("📊 Estatísticas de Theta")
-                theta_stats = results_df['theta'].describe()
+                theta_stats = theta_description[_DESCRIBE_INDEX]
                 st.dataframe(theta_stats)
                 
                 # Métricas de theta
                 st.subheader("📊 Métricas de Theta")
                 col_a, col_b = st.columns(2)
                 with col_a:
-                    st.metric("Média", f"{results_df['theta'].mean():.3f}")
-                    st.metric("Mediana", f"{np.median(results_df['theta']):.3f}")
+                    st.metric("Média", f"{stats['theta_mean']:.3f}")
+                    st.metric("Mediana", f"{stats['theta_median']:.3f}")
                 with col_b:
-                    st.metric("Desvio Padrão", f"{results_df['theta'].std():.3f}")
-                    st.metric("Amplitude", f"{results_df['theta'].max() - results_df['theta'].min():.3f}")
+                    st.metric("Desvio Padrão", f"{stats['theta_std']:.3f}")
+                    st.metric("Amplitude", f"{stats['theta_max'] - stats['theta_min']:.3f}")
             
             with col2:
                 st.subheader("📊 Estatísticas de Nota ENEM")
-                enem_stats = results_df['enem_score'].describe()
+                enem_stats = enem_description[_DESCRIBE_INDEX]
                 st.dataframe(enem_stats)
                 
                 # Métricas de ENEM
                 st.subheader("📊 Métricas de ENEM")
                 col_a, col_b = st.columns(2)
                 with col_a:
-                    st.metric("Média", f"{results_df['enem_score'].mean():.1f}")
-                    st.metric("Mediana", f"{np.median(results_df['enem_score']):.1f}")
+                    st.metric("Média", f"{stats['enem_mean']:.1f}")
+                    st.metric("Mediana", f"{stats['enem_median']:.1f}")
                 with col_b:
-                    st.metric("Desvio Padrão", f"{results_df['enem_score'].std():.1f}")
-                    st.metric("Amplitude", f"{results_df['enem_score'].max() - results_df['enem_score'].min():.0f}")
-        
-            # Percentis
-            st.subheader("📊 Percentis")
-            percentiles = [5, 10, 25, 50, 75, 90, 95]
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.subheader("Percentis de Theta")
-                theta_percentiles = [np.percentile(results_df['theta'], p) for p in percentiles]
-                percentiles_df = pd.DataFrame({
-                    'Percentil': [f'P{p}' for p in percentiles],
-                    'Valor': theta_percentiles
-                })
-                st.dataframe(percentiles_df, use_container_width=True)
-            
-            with col2:
-                st.subheader("Percentis de Nota ENEM")
-                enem_percentiles = [np.percentile(results_df['enem_score'], p) for p in percentiles]
-                percentiles_df = pd.DataFrame({
-                    'Percentil': [f'P{p}' for p in percentiles],
-                    'Valor': enem_percentiles
-                })
-                st.dataframe(percentiles_df, use_container_width=True)
+                    st.metric("Desvio Padrão", f"{stats['enem_std']:.1f}")
+                    st.metric("Amplitude", f"{stats['enem_max'] - stats['enem_min']:.0f}")
         
         with tab3:
             st.subheader("🔗 Análises de Correlação")
             
-            if 'acertos' in results_df.columns:
-                # Correlação theta vs acertos
-                correlation = results_df['acertos'].corr(results_df['theta'])
-                
+            if has_acertos:
                 col1, col2 = st.columns(2)
                 
                 with col1:
@@ -824,28 +1461,28 @@ class TRIDashboard:
                     st.metric("Correlação", f"{correlation:.3f}")
                     
                     # Scatter plot
-                    fig_scatter = px.scatter(results_df, x='acertos', y='theta',
-                                            title=f"Theta vs Acertos (r = {correlation:.3f})")
-                    st.plotly_chart(fig_scatter, use_container_width=True, key=self.get_unique_key("scatter_theta_acertos"))
+                    fig_scatter = _scattergl_fig(acertos_bytes, theta_bytes,
+                                                 'acertos', 'theta', f"Theta vs Acertos (r = {correlation:.3f})")
+                    st.plotly_chart(fig_scatter, use_container_width=True, key=self.get_unique_key("scatter_theta_acertos", "correlacoes"))
                 
                 with col2:
                     # Correlação theta vs ENEM
-                    corr_theta_enem = results_df['theta'].corr(results_df['enem_score'])
                     st.metric("Correlação Theta-ENEM", f"{corr_theta_enem:.3f}")
                     
                     # Scatter plot
-                    fig_scatter2 = px.scatter(results_df, x='theta', y='enem_score',
-                                             title=f"Theta vs ENEM (r = {corr_theta_enem:.3f})")
-                    st.plotly_chart(fig_scatter2, use_container_width=True, key=self.get_unique_key("scatter_theta_enem"))
+                    fig_scatter2 = _scattergl_fig(theta_bytes, enem_bytes,
+                                                  'theta', 'enem_score', f"Theta vs ENEM (r = {corr_theta_enem:.3f})")
+                    st.plotly_chart(fig_scatter2, use_container_width=True, key=self.get_unique_key("scatter_theta_enem", "correlacoes"))
                 
                 # Correlação acertos vs ENEM
                 if 'percentual_acertos' in results_df.columns:
-                    corr_acertos_enem = results_df['percentual_acertos'].corr(results_df['enem_score'])
+                    percentual_bytes = _column_bytes(results_df['percentual_acertos'])
+                    corr_acertos_enem = _pearson(np.frombuffer(percentual_bytes, dtype=np.float64), enem_arr)
                     st.subheader("🎯 Correlação Percentual de Acertos vs ENEM")
                     st.metric("Correlação", f"{corr_acertos_enem:.3f}")
                     
-                    fig_scatter3 = px.scatter(results_df, x='percentual_acertos', y='enem_score',
-                                             title=f"Percentual de Acertos vs ENEM (r = {corr_acertos_enem:.3f})")
+                    fig_scatter3 = _scattergl_fig(percentual_bytes, enem_bytes,
+                                                  'percentual_acertos', 'enem_score', f"Percentual de Acertos vs ENEM (r = {corr_acertos_enem:.3f})")
                     st.plotly_chart(fig_scatter3, use_container_width=True, key=self.get_unique_key("scatter_acertos_enem"))
             else:
                 st.info("ℹ️ Dados de acertos não disponíveis para análise de correlação")
@@ -866,10 +1503,10 @@ class TRIDashboard:
             
             # Ordenar por theta (maior para menor)
             display_df = results_df.sort_values('theta', ascending=False)
-            st.dataframe(display_df, use_container_width=True)
+            self.show_paginated_dataframe(display_df, "tri_results")
             
-            # Download dos resultados
-            csv_data = results_df.to_csv(index=False)
+            # Download dos resultados (CSV completo, cacheado)
+            csv_data = _df_to_csv_bytes(results_df, _frame_key(results_df))
             # Gerar chave única baseada no hash dos dados para evitar duplicação
             data_hash = hash(csv_data) % 1000000  # Usar apenas os últimos 6 dígitos
             st.download_button(
@@ -885,10 +1522,7 @@ class TRIDashboard:
         if 'uploaded_data' in st.session_state:
             responses_df = st.session_state['uploaded_data']
             
-            if responses_df is not None and 'acertos' in results_df.columns:
-                # Correlação theta vs acertos
-                correlation = results_df['acertos'].corr(results_df['theta'])
-                
+            if responses_df is not None and has_acertos:
                 col1, col2 = st.columns(2)
                 
                 with col1:
@@ -896,48 +1530,24 @@ class TRIDashboard:
                     st.metric("Correlação", f"{correlation:.3f}")
                     
                     # Scatter plot
-                    fig_scatter = px.scatter(results_df, x='acertos', y='theta',
-                                            title=f"Theta vs Acertos (r = {correlation:.3f})")
-                    st.plotly_chart(fig_scatter, use_container_width=True, key=self.get_unique_key("scatter_theta_acertos"))
+                    fig_scatter = _scattergl_fig(acertos_bytes, theta_bytes,
+                                                 'acertos', 'theta', f"Theta vs Acertos (r = {correlation:.3f})")
+                    st.plotly_chart(fig_scatter, use_container_width=True, key=self.get_unique_key("scatter_theta_acertos", "respostas"))
                 
                 with col2:
                     # Correlação theta vs ENEM
-                    corr_theta_enem = results_df['theta'].corr(results_df['enem_score'])
                     st.metric("Correlação Theta-ENEM", f"{corr_theta_enem:.3f}")
                     
                     # Scatter plot
-                    fig_scatter2 = px.scatter(results_df, x='theta', y='enem_score',
-                                             title=f"Theta vs ENEM (r = {corr_theta_enem:.3f})")
-                    st.plotly_chart(fig_scatter2, use_container_width=True, key=self.get_unique_key("scatter_theta_enem"))
-        
-        # Percentis
-        st.subheader("📊 Percentis")
-        
-        percentiles = [5, 10, 25, 50, 75, 90, 95]
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Percentis de Theta")
-            theta_percentiles = [np.percentile(results_df['theta'], p) for p in percentiles]
-            percentiles_df = pd.DataFrame({
-                'Percentil': [f'P{p}' for p in percentiles],
-                'Valor': theta_percentiles
-            })
-            st.dataframe(percentiles_df, use_container_width=True)
-        
-        with col2:
-            st.subheader("Percentis de Nota ENEM")
-            enem_percentiles = [np.percentile(results_df['enem_score'], p) for p in percentiles]
-            percentiles_df = pd.DataFrame({
-                'Percentil': [f'P{p}' for p in percentiles],
-                'Valor': enem_percentiles
-            })
-            st.dataframe(percentiles_df, use_container_width=True)
+                    fig_scatter2 = _scattergl_fig(theta_bytes, enem_bytes,
+                                                  'theta', 'enem_score', f"Theta vs ENEM (r = {corr_theta_enem:.3f})")
+                    st.plotly_chart(fig_scatter2, use_container_width=True, key=self.get_unique_key("scatter_theta_enem", "respostas"))
         
         # Gráfico completo
         st.subheader("📊 Dashboard Completo")
         
+        from plotly.subplots import make_subplots
+        
         fig_complete = make_subplots(
             rows=2, cols=2,
             subplot_titles=('Distribuição de Theta', 'Distribuição de ENEM', 'Theta vs Acertos', 'Theta vs ENEM'),
@@ -945,44 +1555,38 @@ class TRIDashboard:
                    [{"type": "scatter"}, {"type": "scatter"}]]
         )
         
-        # Distribuição de theta
-        fig_complete.add_trace(go.Histogram(x=results_df['theta'], nbinsx=30), row=1, col=1)
-        
-        # Distribuição de ENEM
-        fig_complete.add_trace(go.Histogram(x=results_df['enem_score'], nbinsx=30), row=1, col=2)
-        
-        # Theta vs acertos
-        if 'acertos' in results_df.columns:
-            fig_complete.add_trace(go.Scatter(x=results_df['acertos'], y=results_df['theta'],
-                                             mode='markers'), row=2, col=1)
-        
-        # Theta vs ENEM
-        fig_complete.add_trace(go.Scatter(x=results_df['theta'], y=results_df['enem_score'],
-                                         mode='markers'), row=2, col=2)
-        
-        fig_complete.update_layout(height=800, title_text="Dashboard Completo de Resultados")
+        # Distribuições (bins já calculados pelos histogramas cacheados)
+        traces = [
+            _hist_fig(theta_bytes, 'theta', "Distribuição de Theta", 30).data[0],
+            _hist_fig(enem_bytes, 'enem_score', "Distribuição de Notas ENEM", 30).data[0],
+        ]
+        rows, cols = [1, 1], [1, 2]
+        
+        # Dispersões theta vs acertos e theta vs ENEM (WebGL, float32 e sem hover para reduzir o payload)
+        pairs = [(acertos_arr, theta_arr, 1)] if has_acertos else []
+        pairs.append((theta_arr, enem_arr, 2))
+        for x_arr, y_arr, col in pairs:
+            x_data, y_data = _maybe_resample(x_arr, y_arr)
+            traces.append(go.Scattergl(x=x_data.astype(np.float32), y=y_data.astype(np.float32),
+                                       mode='markers', hoverinfo='skip'))
+            rows.append(2)
+            cols.append(col)
+        
+        # Um único add_traces para todos os subplots
+        fig_complete.add_traces(traces, rows=rows, cols=cols)
+        fig_complete.update_layout(height=800, title_text="Dashboard Completo de Resultados",
+                                   bargap=0, uirevision='static')
         st.plotly_chart(fig_complete, use_container_width=True, key=self.get_unique_key("complete_dashboard"))
         
         # Estatísticas resumidas
         st.subheader("📊 Resumo Estatístico")
         
-        stats = {
-            'theta_mean': results_df['theta'].mean(),
-            'theta_std': results_df['theta'].std(),
-            'theta_min': results_df['theta'].min(),
-            'theta_max': results_df['theta'].max(),
-            'enem_mean': results_df['enem_score'].mean(),
-            'enem_std': results_df['enem_score'].std(),
-            'enem_min': results_df['enem_score'].min(),
-            'enem_max': results_df['enem_score'].max()
-        }
-        
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("📈 Estatísticas de Theta")
             st.metric("Média", f"{stats.get('theta_mean', 0):.3f}")
-            st.metric("Mediana", f"{np.median(results_df['theta']):.3f}")
+            st.metric("Mediana", f"{stats.get('theta_median', 0):.3f}")
             st.metric("Desvio Padrão", f"{stats.get('theta_std', 0):.3f}")
             st.metric("Mínimo", f"{stats.get('theta_min', 0):.3f}")
             st.metric("Máximo", f"{stats.get('theta_max', 0):.3f}")
@@ -990,46 +1594,34 @@ class TRIDashboard:
         with col2:
             st.subheader("📈 Estatísticas de Nota ENEM")
             st.metric("Média", f"{stats.get('enem_mean', 0):.1f}")
-            st.metric("Mediana", f"{np.median(results_df['enem_score']):.1f}")
+            st.metric("Mediana", f"{stats.get('enem_median', 0):.1f}")
             st.metric("Desvio Padrão", f"{stats.get('enem_std', 0):.1f}")
             st.metric("Mínimo", f"{stats.get('enem_min', 0):.0f}")
             st.metric("Máximo", f"{stats.get('enem_max', 0):.0f}")
         
-        # Percentis detalhados
+        # Percentis (tabela única; P5, P10, P25, P50, P75, P90 e P95 destacados)
         st.subheader("📊 Percentis Detalhados")
-        
-        percentiles = [1, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80, 85, 90, 95, 99]
+        st.caption("Percentis principais (P5, P10, P25, P50, P75, P90 e P95) em destaque")
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Percentis de Theta")
-            theta_percentiles = [np.percentile(results_df['theta'], p) for p in percentiles]
-            percentiles_df = pd.DataFrame({
-                'Percentil': [f'P{p}' for p in percentiles],
-                'Valor': theta_percentiles
-            })
-            st.dataframe(percentiles_df, use_container_width=True)
+            st.dataframe(_detailed_percentiles_table(theta_description), use_container_width=True)
         
         with col2:
             st.subheader("Percentis de Nota ENEM")
-            enem_percentiles = [np.percentile(results_df['enem_score'], p) for p in percentiles]
-            percentiles_df = pd.DataFrame({
-                'Percentil': [f'P{p}' for p in percentiles],
-                'Valor': enem_percentiles
-            })
-            st.dataframe(percentiles_df, use_container_width=True)
+            st.dataframe(_detailed_percentiles_table(enem_description), use_container_width=True)
 
     def equating_tab(self):
         """Aba de equating de escalas"""
         st.header("🔄 Equating de Escalas")
         
-        if 'results_df' not in st.session_state:
+        results_df = self.get_results_df()
+        if results_df is None:
             st.warning("⚠️ Processe dados TRI primeiro para realizar equating.")
             return
         
-        results_df = st.session_state['results_df']
-        
         # Seleção de método de equating
         equating_method = st.selectbox(
             "Método de Equating:",
@@ -1047,91 +1639,72 @@ class TRIDashboard:
                     
                     # Persistir no banco
                     try:
-                        session = SessionLocal()
-                        dataset_id = st.session_state.get('dataset_id') # Assuming dataset_id is set elsewhere or needs to be passed
-                        execution = crud.create_execution(
-                            session,
-                            dataset_id=dataset_id,
-                            parameters_set_id=st.session_state.get('parameters_set_id'),
-                            status='completed'
-                        )
-                        crud.bulk_insert_results(session, execution.id, equated_results_df)
+                        with _db_session() as session:
+                            dataset_id = st.session_state.get('dataset_id') # Assuming dataset_id is set elsewhere or needs to be passed
+                            execution = crud.create_execution(
+                                session,
+                                dataset_id=dataset_id,
+                                parameters_set_id=st.session_state.get('parameters_set_id'),
+                                status='completed'
+                            )
+                            crud.bulk_insert_results(session, execution.id, equated_results_df)
+                        _list_executions.clear()
                         st.session_state['equated_execution_id'] = execution.id
                         st.info(f"💾 Equating salvo no banco (id={execution.id})")
                     except Exception as e:
                         st.error(f"❌ Erro ao salvar equating no banco: {e}")
-                    finally:
-                        session.close()
-                    
-                    # Mostrar resultados
-                    self.show_equating_results(equated_results_df)
                     
                 except Exception as e:
                     st.error(f"❌ Erro no equating: {e}")
         
-        # Mostrar resultados se disponíveis
+        # Mostrar resultados se disponíveis (uma única vez por rerun)
         if 'equated_results_df' in st.session_state:
             self.show_equating_results(st.session_state['equated_results_df'])
     
+    @_fragment
     def show_equating_results(self, equated_results_df):
         """Mostra resultados do equating"""
         st.subheader("📊 Resultados do Equating")
         
         # Estatísticas gerais
+        stats = _summary_stats(_column_bytes(equated_results_df['theta']),
+                               _column_bytes(equated_results_df['enem_score']))
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.metric("Total de Estudantes", len(equated_results_df))
         with col2:
-            theta_mean = equated_results_df['theta'].mean()
-            st.metric("Theta Médio", f"{theta_mean:.3f}")
+            st.metric("Theta Médio", f"{stats['theta_mean']:.3f}")
         with col3:
-            enem_mean = equated_results_df['enem_score'].mean()
-            st.metric("Nota ENEM Média", f"{enem_mean:.1f}")
+            st.metric("Nota ENEM Média", f"{stats['enem_mean']:.1f}")
         with col4:
-            theta_std = equated_results_df['theta'].std()
-            st.metric("Desvio Padrão Theta", f"{theta_std:.3f}")
+            st.metric("Desvio Padrão Theta", f"{stats['theta_std']:.3f}")
         
         # Gráficos
         col1, col2 = st.columns(2)
         
         with col1:
             # Distribuição de Theta
-            fig_theta = px.histogram(
-                equated_results_df, 
-                x='Theta',
-                title="Distribuição de Theta (Equated)",
-                nbins=20
-            )
+            fig_theta = _hist_fig(_column_bytes(equated_results_df['theta']), 'theta',
+                                  "Distribuição de Theta (Equated)", 20)
             st.plotly_chart(fig_theta, use_container_width=True)
         
         with col2:
             # Distribuição de Notas ENEM
-            fig_enem = px.histogram(
-                equated_results_df, 
-                x='enem_score',
-                title="Distribuição de Notas ENEM (Equated)",
-                nbins=20
-            )
+            fig_enem = _hist_fig(_column_bytes(equated_results_df['enem_score']), 'enem_score',
+                                 "Distribuição de Notas ENEM (Equated)", 20)
             st.plotly_chart(fig_enem, use_container_width=True)
         
-        # Scatter plot Theta vs ENEM
-        try:
-            fig_scatter = px.scatter(
-                equated_results_df,
-                x='theta',
-                y='enem_score',
-                title="Correlação: Theta vs Nota ENEM (Equated)",
-                trendline="ols"
-            )
-        except ImportError:
-            # Fallback sem trendline se statsmodels não estiver disponível
-            fig_scatter = px.scatter(
-                equated_results_df,
-                x='theta',
-                y='enem_score',
-                title="Correlação: Theta vs Nota ENEM (Equated)"
-            )
+        # Scatter plot Theta vs ENEM (statsmodels só é importado pelo plotly se instalado)
+        trendline = "ols" if _has_statsmodels() else None
+        fig_scatter = _scatter_fig(
+            _column_bytes(equated_results_df['theta']),
+            _column_bytes(equated_results_df['enem_score']),
+            'theta', 'enem_score',
+            "Correlação: Theta vs Nota ENEM (Equated)",
+            trendline=trendline
+        )
+        if trendline is None:
             st.info("ℹ️ Linha de tendência não disponível (statsmodels não instalado)")
         st.plotly_chart(fig_scatter, use_container_width=True)
         
@@ -1140,7 +1713,7 @@ class TRIDashboard:
         st.dataframe(equated_results_df, use_container_width=True)
         
         # Download dos resultados
-        csv_data = equated_results_df.to_csv(index=False)
+        csv_data = _df_to_csv_bytes(equated_results_df, _frame_key(equated_results_df))
         st.download_button(
             label="📥 Download Resultados Equatados (CSV)",
             data=csv_data,
@@ -1149,168 +1722,195 @@ class TRIDashboard:
             key="download_equated_results"
         )
 
+    @_fragment
     def history_tab(self):
         """Aba de histórico de resultados (via banco)"""
         st.header("💾 Histórico de Resultados (Banco)")
-        try:
-            session = SessionLocal()
-            executions = crud.list_executions(session)
-        finally:
-            session.close()
+        notice = st.session_state.pop('_history_notice', None)
+        if notice:
+            st.success(notice)
+        executions = _list_executions()
         
         if not executions:
             st.info("📝 Nenhuma execução salva no banco ainda.")
             return
         
-        for exec_info in executions:
-            # Usar o nome personalizado se disponível, senão usar o padrão
-            display_name = exec_info['name'] or f"Execução {exec_info['id']}"
-            
-            # Verificar se esta execução está carregada
-            is_currently_loaded = (
-                'current_execution_id' in st.session_state and 
-                st.session_state['current_execution_id'] == exec_info['id']
+        # Uma única tabela para todas as execuções; as ações valem para a linha selecionada
+        current_id = st.session_state.get('current_execution_id')
+        exec_df = pd.DataFrame(executions)
+        table = pd.DataFrame({
+            'ID': exec_df['id'],
+            'Nome': exec_df['name'].fillna('Execução ' + exec_df['id'].astype(str)),
+            'Criada em': exec_df['created_at'].astype(str).str[:19],
+            'Estudantes': exec_df['total_students'],
+            'Theta Médio': exec_df['theta_mean'],
+            'ENEM Médio': exec_df['enem_mean'],
+            'Status': exec_df['status'],
+            'Carregada': exec_df['id'].eq(current_id),
+        })
+        event = st.dataframe(
+            table,
+            hide_index=True,
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            # O sufixo muda a cada exclusão, descartando a seleção anterior
+            key=f"history_table_{st.session_state.get('_history_table_version', 0)}",
+            column_config={
+                'Theta Médio': st.column_config.NumberColumn(format="%.3f"),
+                'ENEM Médio': st.column_config.NumberColumn(format="%.1f"),
+                'Carregada': st.column_config.CheckboxColumn(),
+            }
+        )
+        
+        # A seleção é uma posição de linha que o widget mantém entre reruns; o ID
+        # é lido quando a linha é escolhida e reaproveitado enquanto ela não
+        # muda, para que a lista mudar de ordem não troque a execução do painel
+        selected_id = None
+        selected_rows = event.selection.rows
+        if selected_rows:
+            row = selected_rows[0]
+            remembered = st.session_state.get('_history_selection')
+            if remembered is not None and remembered[0] == row:
+                selected_id = remembered[1]
+            elif 0 <= row < len(table):
+                selected_id = int(table['ID'].iat[row])
+            st.session_state['_history_selection'] = (row, selected_id)
+        else:
+            st.session_state.pop('_history_selection', None)
+        
+        exec_info = next((e for e in executions if e['id'] == selected_id), None)
+        if exec_info is None:
+            # Sem seleção válida: painel da execução carregada, se houver
+            exec_info = next((e for e in executions if e['id'] == current_id), None)
+        if exec_info is None:
+            st.caption("👆 Selecione uma execução na tabela para renomear, carregar, baixar ou deletar")
+            return
+        
+        # Usar o nome personalizado se disponível, senão usar o padrão
+        display_name = exec_info['name'] or f"Execução {exec_info['id']}"
+        
+        # Verificar se esta execução está carregada
+        is_currently_loaded = current_id == exec_info['id']
+        
+        panel_title = f"📊 {display_name} - {str(exec_info['created_at'])[:19]}"
+        if is_currently_loaded:
+            panel_title += " 🟢 CARREGADA"
+        st.subheader(panel_title)
+        
+        # Interface para renomear execução
+        st.subheader("✏️ Renomear Execução")
+        col_name1, col_name2 = st.columns([3, 1])
+        
+        with col_name1:
+            new_name = st.text_input(
+                f"Nome da Execução #{exec_info['id']}:",
+                value=exec_info['name'] or f"Execução {exec_info['id']}",
+                key=f"rename_input_{exec_info['id']}"
             )
-            
-            expander_title = f"📊 {display_name} - {str(exec_info['created_at'])[:19]}"
-            if is_currently_loaded:
-                expander_title += " 🟢 CARREGADA"
-            
-            with st.expander(expander_title):
-                # Interface para renomear execução
-                st.subheader("✏️ Renomear Execução")
-                col_name1, col_name2 = st.columns([3, 1])
-                
-                with col_name1:
-                    new_name = st.text_input(
-                        f"Nome da Execução #{exec_info['id']}:",
-                        value=exec_info['name'] or f"Execução {exec_info['id']}",
-                        key=f"rename_input_{exec_info['id']}"
-                    )
-                
-                with col_name2:
-                    if st.button(f"💾 Salvar Nome", key=f"save_name_btn_{exec_info['id']}"):
-                        try:
-                            session = SessionLocal()
-                            if crud.update_execution_name(session, exec_info['id'], new_name):
-                                st.success(f"✅ Nome atualizado para: {new_name}")
-                                st.rerun()
-                            else:
-                                st.error("❌ Erro ao atualizar nome")
-                        except Exception as e:
-                            st.error(f"❌ Erro: {e}")
-                        finally:
-                            session.close()
-                
-                # Métricas da execução
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Estudantes", exec_info['total_students'])
-                with col2:
-                    st.metric("Theta Médio", f"{exec_info['theta_mean']:.3f}")
-                with col3:
-                    st.metric("ENEM Médio", f"{exec_info['enem_mean']:.1f}")
-                with col4:
-                    st.metric("Status", exec_info['status'])
-                
-                # Botões de ação
-                st.subheader("🔧 Ações")
-                c1, c2, c3, c4 = st.columns([1,1,1,1])
-                
-                with c4:
-                    if is_currently_loaded:
-                        if st.button(f"🗑️ Descarregar", key=f"unload_btn_{exec_info['id']}"):
-                            # Limpar dados carregados
-                            if 'results_df' in st.session_state:
-                                del st.session_state['results_df']
-                            if 'current_execution_id' in st.session_state:
-                                del st.session_state['current_execution_id']
-                            if 'current_execution_name' in st.session_state:
-                                del st.session_state['current_execution_name']
-                            st.success("✅ Resultados descarregados")
-                            st.rerun()
-                with c1:
-                    if st.button(f"🔄 Carregar resultados", key=f"load_btn_{exec_info['id']}"):
-                        try:
-                            session = SessionLocal()
-                            df = crud.get_execution_results(session, exec_info['id'])
-                            if df.empty:
-                                st.warning("Sem resultados para esta execução.")
-                            else:
-                                # Debug: mostrar informações dos dados
-                                # st.write(f"Colunas disponíveis: {list(df.columns)}")
-                                # st.write(f"Primeira linha: {df.iloc[0].to_dict()}")
-                                
-                                # Carregar resultados em todas as abas relevantes
-                                st.session_state['results_df'] = df.copy()  # Usar cópia para evitar referências
-                                st.session_state['current_execution_id'] = exec_info['id']
-                                st.session_state['current_execution_name'] = exec_info['name']
-                                
-                                # Verificar se foi salvo corretamente
-                                st.write("🔍 **Verificação de salvamento:**")
-                                st.write(f"results_df salvo: {'results_df' in st.session_state}")
-                                st.write(f"current_execution_id salvo: {'current_execution_id' in st.session_state}")
-                                st.write(f"current_execution_name salvo: {'current_execution_name' in st.session_state}")
-                                
-                                # Converter nomes das colunas para compatibilidade
-                                if 'Theta' in df.columns and 'theta' not in df.columns:
-                                    df['theta'] = df['Theta']
-                                if 'Nota_ENEM' in df.columns and 'enem_score' not in df.columns:
-                                    df['enem_score'] = df['Nota_ENEM']
-                                
-                                st.success(f"✅ Resultados carregados para todas as abas!")
-                                st.info(f"📊 {len(df)} resultados da execução '{exec_info['name']}' carregados")
-                                st.info("💡 Vá para as abas 'Processamento TRI' ou 'Visualizações' para ver os dados")
-                                
-                                # Debug: verificar estado da sessão
-                                # st.write(f"results_df presente: {'results_df' in st.session_state}")
-                                # st.write(f"current_execution_id: {st.session_state.get('current_execution_id', 'N/A')}")
-                                # st.write(f"current_execution_name: {st.session_state.get('current_execution_name', 'N/A')}")
-                                
-                                # Botão para forçar atualização
-                                if st.button("🔄 Atualizar Página", key=f"refresh_btn_{exec_info['id']}"):
-                                    st.rerun()
-                        finally:
-                            session.close()
-                with c2:
-                    if st.button(f"📥 Download CSV", key=f"download_btn_{exec_info['id']}"):
-                        try:
-                            session = SessionLocal()
-                            df = crud.get_execution_results(session, exec_info['id'])
-                        finally:
-                            session.close()
-                        if df.empty:
-                            st.warning("Sem resultados para exportar.")
-                        else:
-                            st.download_button(
-                                label="Baixar CSV",
-                                data=df.to_csv(index=False),
-                                file_name=f"exec_{exec_info['id']}.csv",
-                                mime="text/csv",
-                                key=f"dbtn_exec_{exec_info['id']}"
-                            )
-                with c3:
-                    if st.button(f"🗑️ Deletar", key=f"delete_btn_{exec_info['id']}"):
-                        try:
-                            session = SessionLocal()
-                            ok = crud.delete_execution(session, exec_info['id'])
-                        finally:
-                            session.close()
-                        if ok:
-                            st.success("✅ Execução deletada.")
+        
+        with col_name2:
+            if st.button(f"💾 Salvar Nome", key=f"save_name_btn_{exec_info['id']}"):
+                try:
+                    with _db_session() as session:
+                        if crud.update_execution_name(session, exec_info['id'], new_name):
+                            _list_executions.clear()
+                            st.success(f"✅ Nome atualizado para: {new_name}")
                             st.rerun()
                         else:
-                            st.error("❌ Não foi possível deletar.")
+                            st.error("❌ Erro ao atualizar nome")
+                except Exception as e:
+                    st.error(f"❌ Erro: {e}")
+        
+        # Métricas da execução
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Estudantes", exec_info['total_students'])
+        with col2:
+            st.metric("Theta Médio", f"{exec_info['theta_mean']:.3f}")
+        with col3:
+            st.metric("ENEM Médio", f"{exec_info['enem_mean']:.1f}")
+        with col4:
+            st.metric("Status", exec_info['status'])
+        
+        # Botões de ação
+        st.subheader("🔧 Ações")
+        c1, c2, c3, c4 = st.columns([1,1,1,1])
+        
+        with c4:
+            if is_currently_loaded:
+                if st.button(f"🗑️ Descarregar", key=f"unload_btn_{exec_info['id']}"):
+                    # Limpar dados carregados
+                    if 'results_df' in st.session_state:
+                        del st.session_state['results_df']
+                    if 'current_execution_id' in st.session_state:
+                        del st.session_state['current_execution_id']
+                    if 'current_execution_name' in st.session_state:
+                        del st.session_state['current_execution_name']
+                    st.session_state.pop('_result_arrays', None)
+                    st.success("✅ Resultados descarregados")
+                    st.rerun()
+        with c1:
+            if st.button(f"🔄 Carregar resultados", key=f"load_btn_{exec_info['id']}"):
+                df = _load_results_from_db(exec_info['id'])
+                if df.empty:
+                    st.warning("Sem resultados para esta execução.")
+                else:
+                    # Debug: mostrar informações dos dados
+                    # st.write(f"Colunas disponíveis: {list(df.columns)}")
+                    # st.write(f"Primeira linha: {df.iloc[0].to_dict()}")
+                    
+                    # Carregar resultados em todas as abas relevantes (apenas o ID fica na sessão)
+                    st.session_state.pop('results_df', None)
+                    st.session_state.pop('_result_arrays', None)
+                    st.session_state['current_execution_id'] = exec_info['id']
+                    st.session_state['current_execution_name'] = exec_info['name']
+                    
+                    # Rerun completo: o histórico é um fragmento e as demais abas precisam ver a execução
+                    st.session_state['_history_notice'] = (
+                        f"✅ {len(df)} resultados da execução '{display_name}' carregados para todas as abas. "
+                        "Vá para as abas 'Processamento TRI' ou 'Visualizações' para ver os dados."
+                    )
+                    st.rerun()
+        with c2:
+            if st.button(f"📥 Download CSV", key=f"download_btn_{exec_info['id']}"):
+                df = _load_results_from_db(exec_info['id'])
+                if df.empty:
+                    st.warning("Sem resultados para exportar.")
+                else:
+                    st.download_button(
+                        label="Baixar CSV",
+                        data=_execution_csv_bytes(exec_info['id']),
+                        file_name=f"exec_{exec_info['id']}.csv",
+                        mime="text/csv",
+                        key=f"dbtn_exec_{exec_info['id']}"
+                    )
+        with c3:
+            if st.button(f"🗑️ Deletar", key=f"delete_btn_{exec_info['id']}"):
+                with _db_session() as session:
+                    ok = crud.delete_execution(session, exec_info['id'])
+                if ok:
+                    _load_results_from_db.clear()
+                    _execution_csv_bytes.clear()
+                    _list_executions.clear()
+                    # Nova chave da tabela: a seleção da linha removida não é reaplicada
+                    st.session_state['_history_table_version'] = st.session_state.get('_history_table_version', 0) + 1
+                    st.session_state.pop('_history_selection', None)
+                    if st.session_state.get('current_execution_id') == exec_info['id']:
+                        st.session_state.pop('current_execution_id', None)
+                        st.session_state.pop('current_execution_name', None)
+                        st.session_state.pop('_result_arrays', None)
+                    st.success("✅ Execução deletada.")
+                    st.rerun()
+                else:
+                    st.error("❌ Não foi possível deletar.")
 
+    @_fragment
     def parameters_tab(self):
         """Aba de parâmetros salvos (itens calibrados)"""
         st.header("📋 Parâmetros Salvos (Itens Calibrados)")
         
-        try:
-            session = SessionLocal()
-            parameters_sets = crud.list_parameters_sets(session)
-        finally:
-            session.close()
+        parameters_sets = _list_parameters_sets()
         
         if not parameters_sets:
             st.info("📝 Nenhum conjunto de parâmetros salvo ainda.")
@@ -1335,16 +1935,16 @@ class TRIDashboard:
                 with col_name2:
                     if st.button(f"💾 Salvar Nome", key=f"save_params_name_btn_{params_info['id']}"):
                         try:
-                            session = SessionLocal()
-                            if crud.update_parameters_set_name(session, params_info['id'], new_name):
-                                st.success(f"✅ Nome atualizado para: {new_name}")
-                                st.rerun()
-                            else:
-                                st.error("❌ Erro ao atualizar nome")
+                            with _db_session() as session:
+                                if crud.update_parameters_set_name(session, params_info['id'], new_name):
+                                    _list_parameter_sets.clear()
+                                    _list_parameters_sets.clear()
+                                    st.success(f"✅ Nome atualizado para: {new_name}")
+                                    st.rerun()
+                                else:
+                                    st.error("❌ Erro ao atualizar nome")
                         except Exception as e:
                             st.error(f"❌ Erro: {e}")
-                        finally:
-                            session.close()
                 
                 # Métricas do conjunto
                 col1, col2, col3 = st.columns(3)
@@ -1362,9 +1962,8 @@ class TRIDashboard:
                 with col1:
                     if st.button(f"📊 Ver Parâmetros", key=f"view_params_btn_{params_info['id']}"):
                         try:
-                            session = SessionLocal()
-                            params_df = crud.get_parameters_set(session, params_info['id'])
-                            session.close()
+                            with _db_session() as session:
+                                params_df = crud.get_parameters_set(session, params_info['id'])
                             
                             st.subheader(f"📊 Parâmetros do Conjunto: {display_name}")
                             
@@ -1384,7 +1983,7 @@ class TRIDashboard:
                             st.dataframe(params_df, use_container_width=True)
                             
                             # Download CSV
-                            csv_data = params_df.to_csv(index=False)
+                            csv_data = _parameters_set_csv_bytes(params_info['id'])
                             st.download_button(
                                 label="📥 Download Parâmetros (CSV)",
                                 data=csv_data,
@@ -1399,11 +1998,7 @@ class TRIDashboard:
                 with col2:
                     if st.button(f"📥 Download CSV", key=f"download_params_btn_{params_info['id']}"):
                         try:
-                            session = SessionLocal()
-                            params_df = crud.get_parameters_set(session, params_info['id'])
-                            session.close()
-                            
-                            csv_data = params_df.to_csv(index=False)
+                            csv_data = _parameters_set_csv_bytes(params_info['id'])
                             file_name = f"parametros_conjunto_{params_info['id']}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv"
                             
                             st.download_button(
@@ -1421,7 +2016,11 @@ class TRIDashboard:
 def main():
     """Função principal do dashboard"""
     dashboard = TRIDashboard()
-    dashboard.run()
+    try:
+        dashboard.run()
+    finally:
+        # Uma sessão do banco por execução do script (ver _db_session)
+        SessionLocal.remove()
 
 
 if __name__ == "__main__":
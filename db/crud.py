@@ -1,9 +1,11 @@
 from typing import Optional, Iterable, List, Dict
+import io
+import numpy as np
 import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 
-from db.models import Dataset, ParametersSet, ItemParameter, Execution, StudentResult
+from db.models import Dataset, ParametersSet, ItemParameter, Execution, StudentResult, ExecutionSummary
 
 
 def create_dataset(session: Session, name: str, source_type: str, file_name: Optional[str]) -> Dataset:
@@ -15,23 +17,21 @@ def create_dataset(session: Session, name: str, source_type: str, file_name: Opt
 
 
 def create_parameters_set(session: Session, name: Optional[str], is_anchor: bool, params_df: pd.DataFrame) -> ParametersSet:
+    """Cria o conjunto e insere seus itens em um único executemany do Core, sem objetos ORM por linha"""
     param_set = ParametersSet(name=name, is_anchor=is_anchor)
     session.add(param_set)
     session.flush()
 
-    items = []
-    for _, row in params_df.iterrows():
-        items.append(
-            ItemParameter(
-                parameters_set_id=param_set.id,
-                questao=int(row["Questao"]),
-                a=float(row["a"]),
-                b=float(row["b"]),
-                c=float(row["c"]),
-                is_anchor=bool(row["is_anchor"]) if "is_anchor" in params_df.columns else False,
-            )
-        )
-    session.add_all(items)
+    frame = pd.DataFrame({
+        "parameters_set_id": param_set.id,
+        "questao": params_df["Questao"].astype(int),
+        "a": params_df["a"].astype(float),
+        "b": params_df["b"].astype(float),
+        "c": params_df["c"].astype(float),
+        "is_anchor": params_df["is_anchor"].astype(bool) if "is_anchor" in params_df.columns else False,
+    })
+    if len(frame):
+        session.execute(ItemParameter.__table__.insert(), frame.to_dict("records"))
     session.commit()
     session.refresh(param_set)
     return param_set
@@ -88,41 +88,87 @@ def create_execution(session: Session, dataset_id: Optional[int], parameters_set
     return execution
 
 
-def bulk_insert_results(session: Session, execution_id: int, results_df: pd.DataFrame) -> int:
-    records = []
-    for _, row in results_df.iterrows():
-        records.append(
-            StudentResult(
-                execution_id=execution_id,
-                cod_pessoa=str(row["CodPessoa"]),
-                theta=float(row["theta"]),
-                enem_score=float(row["enem_score"]),
-                acertos=int(row.get("acertos", 0)),
-                total_itens=int(row.get("total_itens", 0)),
-            )
+def _column_summary(values: np.ndarray, prefix: str) -> Dict[str, Optional[float]]:
+    """Média, desvio padrão amostral, mínimo e máximo de uma coluna (None quando indefinidos)"""
+    values = values[np.isfinite(values)]
+    n = len(values)
+    return {
+        f"{prefix}_mean": float(values.mean()) if n else None,
+        f"{prefix}_std": float(values.std(ddof=1)) if n > 1 else None,
+        f"{prefix}_min": float(values.min()) if n else None,
+        f"{prefix}_max": float(values.max()) if n else None,
+    }
+
+
+def _sample_std(n: int, mean: Optional[float], sq_mean: Optional[float]) -> Optional[float]:
+    """Desvio padrão amostral a partir de avg(x) e avg(x*x) (None quando indefinido)"""
+    if n < 2 or mean is None or sq_mean is None:
+        return None
+    variance = (sq_mean - mean * mean) * n / (n - 1)
+    return float(np.sqrt(max(variance, 0.0)))
+
+
+def _copy_frame(session: Session, table, frame: pd.DataFrame) -> None:
+    """Carrega o frame com COPY FROM STDIN (PostgreSQL via psycopg2), na transação da sessão"""
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    columns = ", ".join(frame.columns)
+    dbapi_connection = session.connection().connection.driver_connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table.name} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def bulk_insert_results(session: Session, execution_id: int, results_df: pd.DataFrame, chunksize: int = 10_000) -> int:
+    """
+    Insere os resultados via executemany do Core, em blocos de `chunksize` linhas e uma única transação
+    
+    No PostgreSQL (psycopg2) as linhas vão em um único COPY FROM STDIN. O
+    resumo da execução (ExecutionSummary) é gravado na mesma transação, para
+    que list_executions não precise agregar student_results a cada leitura.
+    """
+    num_rows = len(results_df)
+    zeros = pd.Series(0, index=results_df.index)
+    frame = pd.DataFrame({
+        "execution_id": execution_id,
+        "cod_pessoa": results_df["CodPessoa"].astype(str),
+        "theta": results_df["theta"].astype(float),
+        "enem_score": results_df["enem_score"].astype(float),
+        "acertos": results_df.get("acertos", zeros).astype(int),
+        "total_itens": results_df.get("total_itens", zeros).astype(int),
+    })
+    table = StudentResult.__table__
+    if session.get_bind().dialect.driver == "psycopg2":
+        _copy_frame(session, table, frame)
+    else:
+        for start in range(0, num_rows, chunksize):
+            session.execute(table.insert(), frame.iloc[start:start + chunksize].to_dict("records"))
+    session.merge(
+        ExecutionSummary(
+            execution_id=execution_id,
+            total_students=num_rows,
+            **_column_summary(frame["theta"].to_numpy(), "theta"),
+            **_column_summary(frame["enem_score"].to_numpy(), "enem"),
         )
-    session.add_all(records)
+    )
     session.commit()
-    return len(records)
+    return num_rows
 
 
 def get_execution_results(session: Session, execution_id: int) -> pd.DataFrame:
-    rows = (
-        session.query(StudentResult)
-        .filter(StudentResult.execution_id == execution_id)
-        .all()
+    """Lê os resultados de uma execução direto em colunas do DataFrame, sem materializar objetos ORM"""
+    table = StudentResult.__table__
+    query = (
+        select(
+            table.c.cod_pessoa.label("CodPessoa"),
+            table.c.theta,
+            table.c.enem_score,
+            table.c.acertos,
+            table.c.total_itens,
+        )
+        .where(table.c.execution_id == execution_id)
     )
-    data = [
-        {
-            "CodPessoa": r.cod_pessoa,
-            "theta": r.theta,
-            "enem_score": r.enem_score,
-            "acertos": r.acertos,
-            "total_itens": r.total_itens,
-        }
-        for r in rows
-    ]
-    df = pd.DataFrame(data)
+    df = pd.read_sql(query, session.connection())
     
     # Calcular percentual de acertos
     df['percentual_acertos'] = (df['acertos'] / df['total_itens'] * 100).round(2)
@@ -131,7 +177,7 @@ def get_execution_results(session: Session, execution_id: int) -> pd.DataFrame:
 
 
 def list_executions(session: Session) -> List[Dict]:
-    """Lista todas as execuções com informações resumidas"""
+    """Lista todas as execuções com informações resumidas (lidas de execution_summaries)"""
     rows = (
         session.query(
             Execution.id,
@@ -140,39 +186,71 @@ def list_executions(session: Session) -> List[Dict]:
             Execution.created_at,
             Execution.dataset_id,
             Execution.parameters_set_id,
-            func.count(StudentResult.id).label("total_students"),
-            func.avg(StudentResult.theta).label("theta_mean"),
-            func.avg(StudentResult.enem_score).label("enem_mean")
+            ExecutionSummary.total_students,
+            ExecutionSummary.theta_mean,
+            ExecutionSummary.theta_std,
+            ExecutionSummary.enem_mean,
+            ExecutionSummary.enem_std,
         )
-        .join(StudentResult, StudentResult.execution_id == Execution.id, isouter=True)
-        .group_by(Execution.id)
+        .join(ExecutionSummary, ExecutionSummary.execution_id == Execution.id, isouter=True)
         .order_by(Execution.created_at.desc())
         .all()
     )
     
-    return [
-        {
+    # Execuções gravadas antes do resumo existir: uma única agregação só para elas
+    # (desvio de avg(x) e avg(x*x), disponíveis também no SQLite)
+    legacy_ids = [r.id for r in rows if r.total_students is None]
+    legacy = {}
+    if legacy_ids:
+        for r in (
+            session.query(
+                StudentResult.execution_id,
+                func.count(StudentResult.id).label("total_students"),
+                func.avg(StudentResult.theta).label("theta_mean"),
+                func.avg(StudentResult.theta * StudentResult.theta).label("theta_sq_mean"),
+                func.avg(StudentResult.enem_score).label("enem_mean"),
+                func.avg(StudentResult.enem_score * StudentResult.enem_score).label("enem_sq_mean")
+            )
+            .filter(StudentResult.execution_id.in_(legacy_ids))
+            .group_by(StudentResult.execution_id)
+            .all()
+        ):
+            legacy[r.execution_id] = {
+                "total_students": r.total_students,
+                "theta_mean": r.theta_mean,
+                "theta_std": _sample_std(r.total_students, r.theta_mean, r.theta_sq_mean),
+                "enem_mean": r.enem_mean,
+                "enem_std": _sample_std(r.total_students, r.enem_mean, r.enem_sq_mean),
+            }
+    
+    executions = []
+    for r in rows:
+        summary = legacy.get(r.id) or r._asdict()
+        executions.append({
             "id": r.id,
             "name": r.name,
             "status": r.status,
             "created_at": r.created_at,
             "dataset_id": r.dataset_id,
             "parameters_set_id": r.parameters_set_id,
-            "total_students": int(r.total_students or 0),
-            "theta_mean": float(r.theta_mean or 0),
-            "enem_mean": float(r.enem_mean or 0),
+            "total_students": int(summary["total_students"] or 0),
+            "theta_mean": float(summary["theta_mean"] or 0),
+            # Desvio indefinido (menos de dois estudantes) fica None em vez de 0
+            "theta_std": summary["theta_std"],
+            "enem_mean": float(summary["enem_mean"] or 0),
+            "enem_std": summary["enem_std"],
             "num_items": 0  # Será calculado separadamente se necessário
-        }
-        for r in rows
-    ]
+        })
+    return executions
 
 
 def delete_execution(session: Session, execution_id: int) -> bool:
     try:
         execution = session.query(Execution).filter(Execution.id == execution_id).first()
         if execution:
-            # Deletar resultados primeiro
+            # Deletar resultados e resumo primeiro
             session.query(StudentResult).filter(StudentResult.execution_id == execution_id).delete()
+            session.query(ExecutionSummary).filter(ExecutionSummary.execution_id == execution_id).delete()
             # Deletar execução
             session.delete(execution)
             session.commit()
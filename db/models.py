@@ -70,6 +70,7 @@ class Execution(Base):
     dataset: Mapped[Dataset] = relationship("Dataset", back_populates="executions")
     parameters_set: Mapped[ParametersSet] = relationship("ParametersSet", back_populates="executions")
     results: Mapped[list["StudentResult"]] = relationship("StudentResult", back_populates="execution", cascade="all,delete-orphan")
+    summary: Mapped[Optional["ExecutionSummary"]] = relationship("ExecutionSummary", back_populates="execution", cascade="all,delete-orphan", uselist=False)
 
 
 class StudentResult(Base):
@@ -87,3 +88,19 @@ class StudentResult(Base):
     execution: Mapped[Execution] = relationship("Execution", back_populates="results")
 
 
+class ExecutionSummary(Base):
+    """Métricas resumidas de uma execução, gravadas junto com os resultados"""
+    __tablename__ = "execution_summaries"
+
+    execution_id: Mapped[int] = mapped_column(ForeignKey("executions.id", ondelete="CASCADE"), primary_key=True)
+    total_students: Mapped[int] = mapped_column(Integer, nullable=False)
+    theta_mean: Mapped[Optional[float]] = mapped_column(Float)
+    theta_std: Mapped[Optional[float]] = mapped_column(Float)
+    theta_min: Mapped[Optional[float]] = mapped_column(Float)
+    theta_max: Mapped[Optional[float]] = mapped_column(Float)
+    enem_mean: Mapped[Optional[float]] = mapped_column(Float)
+    enem_std: Mapped[Optional[float]] = mapped_column(Float)
+    enem_min: Mapped[Optional[float]] = mapped_column(Float)
+    enem_max: Mapped[Optional[float]] = mapped_column(Float)
+
+    execution: Mapped[Execution] = relationship("Execution", back_populates="summary")
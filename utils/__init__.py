@@ -4,7 +4,16 @@ Contém utilitários e ferramentas auxiliares
 """
 
 from .logger import get_logger, TRILogger
-from .visualizations import TRIVisualizer
+from .csv_reader import read_csv_utf8
 
-__all__ = ['get_logger', 'TRILogger', 'TRIVisualizer']
+__all__ = ['get_logger', 'TRILogger', 'TRIVisualizer', 'read_csv_utf8']
+
+
+def __getattr__(name):
+    # TRIVisualizer (matplotlib/seaborn) só é importado quando usado, para que
+    # `utils.logger` não carregue as bibliotecas de gráficos
+    if name == 'TRIVisualizer':
+        from .visualizations import TRIVisualizer
+        return TRIVisualizer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
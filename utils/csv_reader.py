@@ -0,0 +1,54 @@
+"""
+Leitura de CSV compartilhada pelo dashboard, validadores, processador e API
+"""
+import importlib.util
+
+import pandas as pd
+
+# Parser de CSV: pyarrow (multithread) quando instalado; senão o parser C
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
+
+def _check_utf8(df: pd.DataFrame) -> None:
+    """
+    Rejeita colunas que o pyarrow devolveu como bytes
+    
+    Diferente do parser C, o pyarrow não falha com UTF-8 inválido: a coluna
+    inteira vira `bytes` (também nas categorias, com dtype='category'). O
+    primeiro valor inválido é decodificado para levantar o mesmo
+    UnicodeDecodeError do parser C.
+    """
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.cat.categories.to_numpy()
+        elif series.dtype == object:
+            values = series.dropna().to_numpy()
+        else:
+            continue
+        if len(values) and isinstance(values[0], bytes):
+            for value in values:
+                value.decode('utf-8')
+
+
+def read_csv_utf8(source, **kwargs) -> pd.DataFrame:
+    """
+    pd.read_csv em UTF-8 com o parser mais rápido disponível
+    
+    Args:
+        source: Caminho ou buffer do arquivo
+        **kwargs: Argumentos repassados ao pd.read_csv (sep, usecols, dtype, nrows...)
+    
+    Returns:
+        DataFrame lido
+    
+    Raises:
+        UnicodeDecodeError: Se o arquivo não estiver em UTF-8
+    """
+    kwargs.setdefault('encoding', 'utf-8')
+    # O pyarrow não aceita nrows nem chunksize; nesses casos o parser C basta
+    engine = "c" if 'nrows' in kwargs or 'chunksize' in kwargs else CSV_ENGINE
+    df = pd.read_csv(source, engine=engine, **kwargs)
+    if engine == "pyarrow":
+        _check_utf8(df)
+    return df
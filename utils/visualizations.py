@@ -338,15 +338,15 @@ class TRIVisualizer:
             stats['enem_min'] = results_df['enem_score'].min()
             stats['enem_max'] = results_df['enem_score'].max()
             
-            # Percentis
-            percentiles = [10, 25, 50, 75, 90]
+            # Percentis (uma única chamada de np.percentile por coluna)
+            percentiles = np.array([10, 25, 50, 75, 90])
+            theta_percentiles = np.percentile(results_df['theta'].to_numpy(), percentiles)
+            enem_percentiles = np.percentile(results_df['enem_score'].to_numpy(), percentiles)
             stats['theta_percentiles'] = {
-                f'p{p}': np.percentile(results_df['theta'], p) 
-                for p in percentiles
+                f'p{p}': value for p, value in zip(percentiles, theta_percentiles)
             }
             stats['enem_percentiles'] = {
-                f'p{p}': np.percentile(results_df['enem_score'], p) 
-                for p in percentiles
+                f'p{p}': value for p, value in zip(percentiles, enem_percentiles)
             }
             
             # Se tiver dados de entrada